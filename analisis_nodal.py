@@ -1,12 +1,11 @@
+#nucleo de calculo del analisis nodal, importarlo no ejecuta nada: la demo vive en main() y las
+#librerias de graficos (matplotlib, plotly) y pandas se importan solo al construir tablas o graficar
+import functools
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
-from utilities import j, Qb, aof, qo_vogel, qo_darcy, qo_standing, Qo, IPR_curve, IPR_curve_methods
+from potencial_yac import j, aof, Qo_vec, pwf_Qo_vec
 
 
-# Data
+# Data (valores de la demo)
 Pr = 3000 #psia
 Pb = 2300 # psia
 Qt = 1500 #bpd
@@ -50,40 +49,180 @@ def gradient_avg(API, wc, sg_h2o):
     return g_avg
 
 
-#df.columns
-
-columns = ['Q(bpd)', 'Pwf(psia)', 'THP(psia)', 'Pgravity(psia)', 'f', 'F(ft)', 'Pf(psia)', 'Po(psia)', 'Psys(psia)']
-df = pd.DataFrame(columns=columns)
-
-# Here the AOF is divided per 10 in order to evaluate the pwf for these 10 different flow rates
-df[columns[0]] = np.array([0, 750, 1400, 2250, 3000, 3750, 4500, 5250, 6000, 6750, 7500])
-df[columns[1]] = df['Q(bpd)'].apply(lambda x: pwf_darcy(Qt, Pwft, x, Pr, Pb))
-df[columns[2]] = THP
-df[columns[3]] = gradient_avg(API, wc, sg_h2o) * tvd
-df[columns[4]] = df['Q(bpd)'].apply(lambda x: f_darcy(x, ID, C))
-df[columns[5]] = df['f'] * md
-df[columns[6]] = gradient_avg(API, wc, sg_h2o) * df['F(ft)']
-df[columns[7]] = df['THP(psia)'] + df['Pgravity(psia)'] + df['Pf(psia)']
-df[columns[8]] = df['Po(psia)'] - df['Pwf(psia)']
-
-#df
-
-fig2, ax = plt.subplots(figsize=(18, 10))
-
-ax.plot(df['Q(bpd)'].values, df['Pwf(psia)'].values, c='red', label='IPR')
-ax.plot(df['Q(bpd)'].values, df['Po(psia)'].values, c='green', label='VLP')
-ax.plot(df['Q(bpd)'].values, df['Psys(psia)'].values, c='b', label='System Curve')
-ax.set_xlabel('Q(bpd)')
-ax.set_ylabel('Pwf(psia)')
-ax.set_xlim(0, df['Q(bpd)'].max() + 1000)
-ax.set_title('Nodal Analysis')
-ax.grid()
-plt.legend()
-plt.show()
-
-fig = go.Figure()
-fig.add_trace(go.Scatter(x=df['Q(bpd)'], y=df['Pwf(psia)'], name='IPR'))
-fig.add_trace(go.Scatter(x=df['Q(bpd)'], y=df['Po(psia)'], name='VLP'))
-fig.add_trace(go.Scatter(x=df['Q(bpd)'], y=df['Psys(psia)'], name='System Curve'))
-fig.update_layout(title='Nodal Analysis')
-fig.show()
+# Po(psia) @ Q, VLP = THP + gravity + friction (Hanzen-Williams)
+def po_vlp(Q, THP, API, wc, sg_h2o, ID, tvd, md, C=120):
+    g_avg = gradient_avg(API, wc, sg_h2o)
+    po = THP + g_avg * tvd + g_avg * f_darcy(Q, ID, C) * md
+    return po
+
+# Pwf(psia) @ Q for arrays of wells, IPR compuesta: Darcy por encima de Pb y Vogel/Standing por debajo,
+# NaN por encima del AOF
+def pwf_ipr(q_test, pwf_test, q, pr, pb, ef=1, ef2=None):
+    return pwf_Qo_vec(q_test, pwf_test, pr, q, pb, ef, ef2)
+
+# Max rate of the IPR above (Pwf = 0)
+def q_max_ipr(q_test, pwf_test, pr, pb, ef=1, ef2=None):
+    return Qo_vec(q_test, pwf_test, pr, 0.0, pb, ef, ef2)
+
+# Raiz acotada vectorizada (regula falsi, variante Illinois): resuelve fun(x) = 0 para todos los
+# elementos a la vez dentro de [lo, hi]. Los elementos sin cambio de signo en el intervalo quedan NaN
+def bracketed_root(fun, lo, hi, xtol=1e-6, ftol=1e-8, maxiter=100):
+    a, b = np.broadcast_arrays(np.asarray(lo, dtype=float), np.asarray(hi, dtype=float))
+    a, b = a.copy(), b.copy()
+    fa, fb = fun(a), fun(b)
+    valid = np.sign(fa) * np.sign(fb) <= 0
+    x = np.where(fa == 0, a, b)
+    fx = np.where(fa == 0, fa, fb)
+    done = ~valid | (np.abs(fx) <= ftol)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for _ in range(maxiter):
+            if done.all():
+                break
+            x_new = b - fb * (b - a) / (fb - fa)
+            x_new = np.where(np.isfinite(x_new), x_new, 0.5 * (a + b))
+            f_new = fun(x_new)
+            x = np.where(done, x, x_new)
+            fx = np.where(done, fx, f_new)
+            # Illinois: si la raiz cambia de lado se mueve el extremo viejo, si no se reduce f(a) a la mitad
+            crossed = f_new * fb < 0
+            a = np.where(done, a, np.where(crossed, b, a))
+            fa = np.where(done, fa, np.where(crossed, fb, 0.5 * fa))
+            b = np.where(done, b, x_new)
+            fb = np.where(done, fb, f_new)
+            done |= (np.abs(b - a) <= xtol) | (np.abs(f_new) <= ftol)
+
+    return np.where(valid, x, np.nan)
+
+# VLP de nodal_table/operating_point: None o 'hazen_williams' (po_vlp con C), 'beggs_brill' (recorrido
+# multifasico de vlp_multifasico) o una funcion vlp(Q, THP, API, wc, sg_h2o, ID, tvd, md) -> (Po, Pgravity, Pf),
+# ej. functools.partial de traverse_beggs_brill con los datos del fluido.
+# fluid son los argumentos del fluido de traverse_beggs_brill (gor, sg_gas, t_wh, t_bh, ...); 'beggs_brill'
+# los necesita, al menos gor (scf/stb) y sg_gas, para no calcular con un fluido por defecto
+BEGGS_BRILL_FLUID = ('gor', 'sg_gas')
+
+def _vlp_traverse(vlp, fluid=None):
+    if vlp == 'beggs_brill':
+        from vlp_multifasico import traverse_beggs_brill
+
+        missing = [name for name in BEGGS_BRILL_FLUID if name not in (fluid or {})]
+        if missing:
+            raise ValueError(f"The 'beggs_brill' VLP needs the fluid data: {', '.join(missing)}")
+        return functools.partial(traverse_beggs_brill, **fluid)
+    if not callable(vlp):
+        raise ValueError(f"Unknown VLP model: {vlp}")
+    return functools.partial(vlp, **fluid) if fluid else vlp
+
+# Punto de operacion: caudal y presion donde la IPR compuesta corta la VLP, todos los argumentos pueden
+# ser arreglos (pozos o escenarios) y se resuelven juntos con broadcasting.
+# Q = NaN si la VLP esta por encima de Pr (el pozo no fluye)
+def operating_point(q_test, pwf_test, pr, pb, THP, API, wc, sg_h2o, ID, tvd, md, C=120, vlp=None, ef=1, ef2=None,
+                    fluid=None):
+    if vlp is None or vlp == 'hazen_williams':
+        po = lambda q: po_vlp(q, THP, API, wc, sg_h2o, ID, tvd, md, C)
+    else:
+        traverse = _vlp_traverse(vlp, fluid)
+        po = lambda q: traverse(q, THP, API, wc, sg_h2o, ID, tvd, md)[0]
+
+    def residual(q):
+        return pwf_ipr(q_test, pwf_test, q, pr, pb, ef, ef2) - po(q)
+
+    q_max = q_max_ipr(q_test, pwf_test, pr, pb, ef, ef2)
+    shape = np.broadcast_shapes(*(np.shape(arg) for arg in (q_test, pwf_test, pr, pb, THP, API, wc,
+                                                             sg_h2o, ID, tvd, md, C, ef)))
+    q_op = bracketed_root(residual, np.zeros(shape), np.broadcast_to(q_max, shape))
+    pwf_op = pwf_ipr(q_test, pwf_test, q_op, pr, pb, ef, ef2)
+    return q_op, pwf_op
+
+
+# Nodal analysis table @ Q
+NODAL_COLUMNS = ['Q(bpd)', 'Pwf(psia)', 'THP(psia)', 'Pgravity(psia)', 'f', 'F(ft)', 'Pf(psia)', 'Po(psia)', 'Psys(psia)']
+
+# Pwf de la IPR compuesta (NaN por encima del AOF). vlp como en operating_point, con los modelos
+# multifasicos f y F(ft) son los equivalentes de Hazen-Williams (F = Pf / g_avg, f = F / md)
+def nodal_table(q_test, pwf_test, pr, pb, THP, API, wc, sg_h2o, ID, tvd, md, C=120, q=None, vlp=None,
+                fluid=None):
+    import pandas as pd
+
+    columns = NODAL_COLUMNS
+    df = pd.DataFrame(columns=columns)
+
+    # Here the AOF is divided per 10 in order to evaluate the pwf for these 10 different flow rates
+    df[columns[0]] = np.linspace(0, 7500, 10) if q is None else np.asarray(q, dtype=float)
+    df[columns[1]] = pwf_ipr(q_test, pwf_test, df['Q(bpd)'].to_numpy(), pr, pb)
+    df[columns[2]] = THP
+    if vlp is None or vlp == 'hazen_williams':
+        df[columns[3]] = gradient_avg(API, wc, sg_h2o) * tvd
+        df[columns[4]] = f_darcy(df['Q(bpd)'].to_numpy(), ID, C)
+        df[columns[5]] = df['f'] * md
+        df[columns[6]] = gradient_avg(API, wc, sg_h2o) * df['F(ft)']
+        df[columns[7]] = df['THP(psia)'] + df['Pgravity(psia)'] + df['Pf(psia)']
+    else:
+        po, p_gravity, p_f = _vlp_traverse(vlp, fluid)(df['Q(bpd)'].to_numpy(), THP, API, wc, sg_h2o, ID, tvd, md)
+        df[columns[3]] = p_gravity
+        df[columns[5]] = p_f / gradient_avg(API, wc, sg_h2o)
+        df[columns[4]] = df['F(ft)'] / md
+        df[columns[6]] = p_f
+        df[columns[7]] = po
+    df[columns[8]] = df['Po(psia)'] - df['Pwf(psia)']
+    return df
+
+# Nodal plot (matplotlib)
+def plot_nodal(df, ax=None):
+    import matplotlib.pyplot as plt
+
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(18, 10))
+    q = df.columns[0]  # 'Q(bpd)' o 'Qg(Mscf/d)' en las tablas de gas
+    ax.plot(df[q].values, df['Pwf(psia)'].values, c='red', label='IPR')
+    ax.plot(df[q].values, df['Po(psia)'].values, c='green', label='VLP')
+    ax.plot(df[q].values, df['Psys(psia)'].values, c='b', label='System Curve')
+    ax.set_xlabel(q)
+    ax.set_ylabel('Pwf(psia)')
+    ax.set_xlim(0, df[q].max() + 1000)
+    ax.set_title('Nodal Analysis')
+    ax.grid()
+    ax.legend()
+    return ax
+
+# Nodal plot (plotly)
+def plot_nodal_plotly(df):
+    import plotly.graph_objects as go
+
+    q = df.columns[0]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=df[q], y=df['Pwf(psia)'], name='IPR'))
+    fig.add_trace(go.Scatter(x=df[q], y=df['Po(psia)'], name='VLP'))
+    fig.add_trace(go.Scatter(x=df[q], y=df['Psys(psia)'], name='System Curve'))
+    fig.update_layout(title='Nodal Analysis')
+    return fig
+
+
+# Demo con los datos de arriba: python analisis_nodal.py [--no-plot] [--vlp beggs_brill --gor 400 --sg-gas 0.65]
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Nodal analysis demo')
+    parser.add_argument('--no-plot', action='store_true', help='only print the nodal table')
+    parser.add_argument('--vlp', choices=['hazen_williams', 'beggs_brill'], default='hazen_williams',
+                        help='vertical lift model (default: hazen_williams)')
+    parser.add_argument('--gor', type=float, default=400, help='producing GOR for beggs_brill (scf/stb)')
+    parser.add_argument('--sg-gas', type=float, default=0.65, help='gas specific gravity for beggs_brill')
+    args = parser.parse_args(argv)
+
+    q = np.array([0, 750, 1400, 2250, 3000, 3750, 4500, 5250, 6000, 6750, 7500])
+    df = nodal_table(Qt, Pwft, Pr, Pb, THP, API, wc, sg_h2o, ID, tvd, md, C, q=q, vlp=args.vlp,
+                     fluid={'gor': args.gor, 'sg_gas': args.sg_gas})
+    print(df)
+    if args.no_plot:
+        return
+
+    import matplotlib.pyplot as plt
+
+    plot_nodal(df)
+    plt.show()
+    plot_nodal_plotly(df).show()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+#corrida por lotes sin interfaz: lee un CSV o Parquet con una fila por pozo (los mismos campos de las
+#paginas "Cálculos Petrofísicos" y "Análisis Nodal"), calcula J, Qb, AOF, punto de operacion y, si se
+#pide, las curvas IPR, y escribe los resultados por bloques a CSV o Parquet.
+#   python batch.py pozos.csv resultados.parquet --curves curvas.parquet --workers 4
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from potencial_yac import WELL_TEST_FIELDS, IPRModel, Qo_batch, j_darcy
+from analisis_nodal import operating_point
+
+# nombres de los formularios de Streamlit que se aceptan como alias
+ALIASES = {'Qt': 'q_test', 'Pwft': 'pwf_test', 'Pr': 'pr', 'Pb': 'pb'}
+NODAL_FIELDS = ('THP', 'API', 'wc', 'sg_h2o', 'ID', 'tvd', 'md')
+DARCY_FIELDS = ('ko', 'h', 'bo', 'uo', 're', 'rw', 's')
+ID_FIELDS = ('row', 'well')
+NUMERIC_FIELDS = WELL_TEST_FIELDS + NODAL_FIELDS + DARCY_FIELDS + ('C',)
+
+
+# Tipo de cada columna de entrada, fijado una vez para todo el archivo antes de leer el primer bloque: los
+# campos de datos numericos, conocidos o no, y las columnas sin valores pasan a float64 (un campo todo nulo
+# o entero en un bloque y con decimales en otro). Los identificadores conservan su tipo ('row' entero y
+# 'well' texto en CSV) y en CSV las demas columnas se leen como texto
+def input_schema(path):
+    import pyarrow as pa
+
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        fields = list(pq.ParquetFile(path).schema_arrow)
+    else:
+        ids = {'row': pa.int64(), 'well': pa.string()}
+        fields = [pa.field(name, ids.get(name, pa.string())) for name in pd.read_csv(path, nrows=0).columns]
+    return pa.schema([pa.field(field.name, _input_type(field)) for field in fields])
+
+
+def _input_type(field):
+    import pyarrow as pa
+
+    kind = field.type
+    if field.name in ID_FIELDS:
+        return pa.string() if pa.types.is_null(kind) else kind
+    if (ALIASES.get(field.name, field.name) in NUMERIC_FIELDS or pa.types.is_integer(kind)
+            or pa.types.is_floating(kind) or pa.types.is_null(kind)):
+        return pa.float64()
+    return kind
+
+
+# Esquemas de las salidas (resultados y curvas), con las mismas columnas y orden que process_chunk
+def output_schemas(schema):
+    import pyarrow as pa
+
+    fields = [pa.field(ALIASES.get(field.name, field.name), field.type) for field in schema]
+    names = {field.name for field in fields}
+    if 'row' not in names:
+        fields.insert(0, pa.field('row', pa.int64()))
+    columns = ['J', 'Qb', 'AOF']
+    if all(field in names for field in DARCY_FIELDS):
+        columns.append('J_darcy')
+    if all(field in names for field in NODAL_FIELDS):
+        columns += ['Q_op(bpd)', 'Pwf_op(psia)']
+    results = pa.schema(fields + [pa.field(name, pa.float64()) for name in columns])
+
+    ids = {field.name: field for field in fields if field.name in ID_FIELDS}
+    curves = [ids['well']] if 'well' in ids else []
+    curves += [ids['row'], pa.field('Pwf(psia)', pa.float64()), pa.field('Qo(bpd)', pa.float64())]
+    return results, pa.schema(curves)
+
+
+# Bloques de chunk_size filas como DataFrame, todos con los tipos de input_schema
+def read_chunks(path, chunk_size, schema=None):
+    schema = schema if schema is not None else input_schema(path)
+    if path.endswith('.parquet'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        offset = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            # numeracion global de filas, como la de read_csv por bloques
+            chunk = pa.Table.from_batches([batch]).cast(schema).to_pandas()
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+    else:
+        dtypes = {field.name: field.type.to_pandas_dtype() for field in schema}
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=dtypes)
+
+
+# Escribe bloques a CSV (agregando) o Parquet (un row group por bloque). Con schema todos los bloques se
+# escriben con ese esquema, si no el archivo toma el del primer bloque
+class ChunkWriter:
+    def __init__(self, path, schema=None):
+        self.path = path
+        self.schema = schema
+        self._parquet = path.endswith('.parquet')
+        self._writer = None
+        self._header = True
+
+    def write(self, df):
+        if self._parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+            if self._writer is None:
+                self.schema = table.schema
+                self._writer = pq.ParquetWriter(self.path, self.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode='w' if self._header else 'a', header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# Resultados de un bloque de pozos, todo vectorizado sobre las filas del bloque
+def process_chunk(wells, curve_points=0):
+    wells = wells.rename(columns=ALIASES)
+    ipr = IPRModel.from_wells(wells)
+    results = pd.DataFrame({'J': ipr.J, 'Qb': ipr.Qb, 'AOF': ipr.AOF}, index=wells.index)
+
+    if all(field in wells for field in DARCY_FIELDS):
+        results['J_darcy'] = j_darcy(*(wells[field].to_numpy(dtype=float) for field in DARCY_FIELDS))
+
+    if all(field in wells for field in NODAL_FIELDS):
+        C = wells['C'].to_numpy(dtype=float) if 'C' in wells else 120
+        q_op, pwf_op = operating_point(ipr.q_test, ipr.pwf_test, ipr.pr, ipr.pb,
+                                       *(wells[field].to_numpy(dtype=float) for field in NODAL_FIELDS), C)
+        results['Q_op(bpd)'] = q_op
+        results['Pwf_op(psia)'] = pwf_op
+
+    # si el archivo ya trae una columna 'row' se usa como identificador de fila, si no se numeran las filas
+    rows = wells['row'].to_numpy() if 'row' in wells else wells.index.to_numpy()
+    results = pd.concat([wells, results], axis=1)
+    if 'row' not in wells:
+        results.insert(0, 'row', rows)
+
+    curves = None
+    if curve_points:
+        # curvas en formato largo: una fila por (pozo, pwf)
+        fraction = np.linspace(1, 0, curve_points)
+        pwf = ipr.pr[:, np.newaxis] * fraction
+        qo = Qo_batch(wells, pwf)
+        curves = pd.DataFrame({
+            'row': np.repeat(rows, curve_points),
+            'Pwf(psia)': pwf.ravel(),
+            'Qo(bpd)': qo.ravel(),
+        })
+        if 'well' in wells:
+            curves.insert(0, 'well', np.repeat(wells['well'].to_numpy(), curve_points))
+    return results, curves
+
+
+def _process_task(args):
+    return process_chunk(*args)
+
+
+def run(input_path, output_path, curves_path=None, curve_points=50, chunk_size=10000, workers=None):
+    schema = input_schema(input_path)
+    results_schema, curves_schema = output_schemas(schema)
+    writer = ChunkWriter(output_path, results_schema)
+    curve_writer = ChunkWriter(curves_path, curves_schema) if curves_path else None
+    curve_points = curve_points if curves_path else 0
+    workers = workers or os.cpu_count() or 1
+
+    def write(result):
+        results, curves = result
+        writer.write(results)
+        if curve_writer is not None:
+            curve_writer.write(curves)
+
+    try:
+        if workers == 1:
+            for chunk in read_chunks(input_path, chunk_size, schema):
+                write(process_chunk(chunk, curve_points))
+            return
+        # como maximo 2 bloques por proceso en vuelo, asi la memoria no crece con el tamaño del archivo
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for chunk in read_chunks(input_path, chunk_size, schema):
+                pending.append(executor.submit(_process_task, (chunk, curve_points)))
+                if len(pending) >= 2 * workers:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+    finally:
+        writer.close()
+        if curve_writer is not None:
+            curve_writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch IPR and nodal analysis over a well list')
+    parser.add_argument('input', help='CSV or Parquet file with one row per well')
+    parser.add_argument('output', help='CSV or Parquet file for the per-well results')
+    parser.add_argument('--curves', help='CSV or Parquet file for the IPR curves')
+    parser.add_argument('--curve-points', type=int, default=50)
+    parser.add_argument('--chunk-size', type=int, default=10000, help='wells per block')
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: all CPUs)')
+    args = parser.parse_args(argv)
+    run(args.input, args.output, args.curves, args.curve_points, args.chunk_size, args.workers)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,251 @@
+#benchmarks de rendimiento con datos sinteticos, se corren a mano o en CI:
+#   python benchmarks.py all --save baseline.json
+#   python benchmarks.py all --baseline baseline.json
+#   python benchmarks.py ipr nodal --quick
+#cada medicion de importacion se hace en un proceso nuevo para medir el arranque en frio
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# modulos de calculo que deben importar rapido y sin librerias de graficos
+STARTUP_MODULES = ('potencial_yac', 'analisis_nodal', 'sensibilidad_nodal')
+HEAVY_MODULES = ('pandas', 'matplotlib', 'plotly', 'scipy', 'streamlit')
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+_IMPORT_CODE = '''
+import sys, time
+t = time.perf_counter()
+import {module}
+print(time.perf_counter() - t)
+print(','.join(m for m in {heavy!r} if m in sys.modules))
+'''
+
+
+# Cold import time (s) of one module, best of `repeat` fresh interpreters
+def bench_startup(module, repeat=5):
+    times = []
+    heavy = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', _IMPORT_CODE.format(module=module, heavy=HEAVY_MODULES)],
+                             capture_output=True, text=True, check=True, cwd=_HERE).stdout.splitlines()
+        times.append(float(out[0]))
+        heavy = [name for name in out[1].split(',') if name] if len(out) > 1 else []
+    return {'seconds': min(times), 'heavy_imports': heavy}
+
+
+def run_startup(repeat=5):
+    return {module: bench_startup(module, repeat) for module in STARTUP_MODULES}
+
+
+# Mejor tiempo (s) de `repeat` corridas de fun()
+def timed(fun, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fun()
+        best = min(best, time.perf_counter() - start)
+    return {'seconds': best}
+
+
+# Pruebas de pozo sinteticas, mezcla de yacimientos subsaturados y saturados
+def synthetic_wells(n, seed=0):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    pr = rng.uniform(2000, 5000, n)
+    return pd.DataFrame({
+        'q_test': rng.uniform(200, 3000, n),
+        'pwf_test': pr * rng.uniform(0.3, 0.9, n),
+        'pr': pr,
+        'pb': rng.uniform(1500, 5000, n),
+        'THP': rng.uniform(100, 600, n),
+        'API': rng.uniform(15, 40, n),
+        'wc': rng.uniform(0, 0.9, n),
+        'sg_h2o': 1.05,
+        'ID': rng.choice([2.441, 2.992, 3.5, 4.0], n),
+        'tvd': rng.uniform(4000, 9000, n),
+        'md': rng.uniform(9000, 11000, n),
+        'C': 120.0,
+    })
+
+
+# Produccion diaria sintetica con las columnas del archivo VOLVE
+def synthetic_production(n_rows, n_wells=20, seed=0):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    days = -(-n_rows // n_wells)
+    wells = np.repeat([f'NO 15/9-F-{i} H' for i in range(n_wells)], days)[:n_rows]
+    dates = np.tile(np.datetime64('2008-01-01') + np.arange(days), n_wells)[:n_rows]
+    oil = rng.gamma(2.0, 800.0, n_rows)
+    oil[rng.random(n_rows) < 0.02] = 0  # cierres
+    df = pd.DataFrame({
+        'DATEPRD': dates,
+        'WELL_BORE_CODE': wells,
+        'BORE_OIL_VOL': oil,
+        'BORE_WAT_VOL': rng.gamma(2.0, 500.0, n_rows),
+        'BORE_GAS_VOL': rng.gamma(2.0, 9e4, n_rows),
+        'FLOW_KIND': 'production',
+    })
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+# j, aof y Qo escalares contra sus versiones vectorizadas, y el calculo de las curvas IPR
+def run_ipr(sizes, repeat=3):
+    from potencial_yac import j, aof, Qo, j_vec, aof_vec, Qo_vec, Qo_batch, ipr_curve
+
+    results = {}
+    for n in sizes:
+        wells = synthetic_wells(n)
+        q_test, pwf_test, pr, pb = (wells[name].to_numpy() for name in ('q_test', 'pwf_test', 'pr', 'pb'))
+        rows = list(zip(q_test, pwf_test, pr, pb))
+        results[f'j_scalar/{n}'] = timed(lambda: [j(*row) for row in rows], repeat)
+        results[f'j_vec/{n}'] = timed(lambda: j_vec(q_test, pwf_test, pr, pb), repeat)
+        results[f'aof_scalar/{n}'] = timed(lambda: [aof(*row) for row in rows], repeat)
+        results[f'aof_vec/{n}'] = timed(lambda: aof_vec(q_test, pwf_test, pr, pb), repeat)
+        results[f'Qo_scalar/{n}'] = timed(lambda: [Qo(a, b, c, 0.5 * c, d) for a, b, c, d in rows], repeat)
+        results[f'Qo_vec/{n}'] = timed(lambda: Qo_vec(q_test, pwf_test, pr, 0.5 * pr, pb), repeat)
+
+        # una curva de n puntos por cada metodo de IPR_curve_methods (solo calculo, sin graficar)
+        methods = ('Darcy', 'Vogel', 'IPR_compuesto', 'Standing', None)
+        results[f'IPR_curve_methods/{n}'] = timed(
+            lambda: [ipr_curve(q_test[0], pwf_test[0], pr[0], pb[0], method=method, points=n) for method in methods],
+            repeat)
+        if n <= 10 ** 4:
+            results[f'Qo_batch_x100/{n}'] = timed(lambda: Qo_batch(wells, np.linspace(5000, 0, 100)), repeat)
+    return results
+
+
+# tabla nodal con n caudales y punto de operacion para n pozos
+def run_nodal(sizes, repeat=3):
+    from analisis_nodal import nodal_table, operating_point
+
+    results = {}
+    for n in sizes:
+        wells = synthetic_wells(n)
+        args = [wells[name].to_numpy() for name in ('q_test', 'pwf_test', 'pr', 'pb', 'THP', 'API', 'wc',
+                                                    'sg_h2o', 'ID', 'tvd', 'md', 'C')]
+        q = np.linspace(0, 7500, n)
+        results[f'nodal_table/{n}'] = timed(
+            lambda: nodal_table(1500, 2400, 3000, 2300, 360, 20, 0.9, 1.09, 3.5, 9000, 10500, 120, q=q), repeat)
+        results[f'operating_point/{n}'] = timed(lambda: operating_point(*args), repeat)
+    return results
+
+
+# ingestion VOLVE (Excel la primera vez, Parquet en cache despues), indice y filtrado por pozo
+def run_volve(rows, max_excel_rows=10 ** 5, repeat=3):
+    import pandas as pd
+    from volve import load_production, content_hash, ProductionIndex
+
+    results = {}
+    for n in rows:
+        data = synthetic_production(n)
+        well = data['WELL_BORE_CODE'].iloc[0]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            if n <= max_excel_rows:
+                buffer = io.BytesIO()
+                data.to_excel(buffer, index=False)
+                content = buffer.getvalue()
+                results[f'read_excel_first_load/{n}'] = timed(
+                    lambda: load_production(content, tempfile.mkdtemp(dir=cache_dir)), 1)
+                load_production(content, cache_dir)
+            else:
+                # escribir el Excel seria demasiado lento, se deja directamente la copia Parquet en cache
+                content = f'synthetic-{n}'.encode()
+                data.to_parquet(os.path.join(cache_dir, content_hash(content) + '.parquet'), index=False)
+            results[f'parquet_cached_load/{n}'] = timed(lambda: load_production(content, cache_dir), repeat)
+
+        def scan():
+            well_data = data[data['WELL_BORE_CODE'] == well]
+            well_data = well_data.assign(DATEPRD=pd.to_datetime(well_data['DATEPRD'], errors='coerce'))
+            return well_data.sort_values(by='DATEPRD')
+
+        results[f'well_filter_scan/{n}'] = timed(scan, repeat)
+        results[f'index_build/{n}'] = timed(lambda: ProductionIndex(data), 1)
+        index = ProductionIndex(data)
+        results[f'well_filter_index/{n}'] = timed(lambda: index.well(well), repeat)
+    return results
+
+
+# Compara contra una linea base, devuelve la lista de regresiones encontradas. Diferencias menores a
+# min_seconds no cuentan, en los casos de microsegundos son solo ruido
+def compare(results, baseline, tolerance=0.25, min_seconds=1e-3):
+    regressions = []
+    for section, cases in results.items():
+        for name, result in cases.items():
+            base = baseline.get(section, {}).get(name)
+            if base is None:
+                continue
+            slower = result['seconds'] - base['seconds']
+            if result['seconds'] > base['seconds'] * (1 + tolerance) and slower > min_seconds:
+                regressions.append(f"{section}/{name}: {result['seconds']:.4f}s vs {base['seconds']:.4f}s")
+            new_heavy = set(result.get('heavy_imports', [])) - set(base.get('heavy_imports', []))
+            if new_heavy:
+                regressions.append(f"{section}/{name}: now imports {', '.join(sorted(new_heavy))}")
+    return regressions
+
+
+SUITES = ('startup', 'ipr', 'nodal', 'volve')
+SIZES = (10, 10 ** 3, 10 ** 5)
+ROWS = (10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7)
+QUICK_SIZES = (10, 10 ** 3)
+QUICK_ROWS = (10 ** 4,)
+
+
+def run(suites, sizes=SIZES, rows=ROWS, repeat=3):
+    results = {}
+    for suite in suites:
+        if suite == 'startup':
+            results['startup'] = run_startup(max(repeat, 3))
+        elif suite == 'ipr':
+            results['ipr'] = run_ipr(sizes, repeat)
+        elif suite == 'nodal':
+            results['nodal'] = run_nodal(sizes, repeat)
+        elif suite == 'volve':
+            results['volve'] = run_volve(rows, repeat=repeat)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Performance benchmarks')
+    parser.add_argument('suites', nargs='+', choices=SUITES + ('all',))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--quick', action='store_true', help='small sizes only')
+    parser.add_argument('--sizes', type=int, nargs='+', help='points or wells per case')
+    parser.add_argument('--rows', type=int, nargs='+', help='production rows for the volve suite')
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='compare against this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    suites = SUITES if 'all' in args.suites else args.suites
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    rows = args.rows or (QUICK_ROWS if args.quick else ROWS)
+    results = run(suites, sizes, rows, args.repeat)
+    for section, cases in results.items():
+        for name, result in cases.items():
+            print(f"{section}/{name}: {result['seconds']:.6f}s {' '.join(result.get('heavy_imports', []))}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
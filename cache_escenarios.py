@@ -0,0 +1,125 @@
+#cache de escenarios compartido por todas las sesiones del servidor: guarda curvas IPR, tablas nodales y
+#figuras ya calculadas, con clave en los parametros de entrada normalizados, limite de tamaño (LRU),
+#vencimiento (TTL) y conteo de aciertos/fallos. Los valores se comparten entre sesiones, asi que se guardan
+#inmutables: los arreglos quedan de solo lectura y cada lectura recibe su propia copia de los DataFrames
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+# valores equivalentes (2000 y 2000.0, np.float64 y float, arreglos iguales) dan la misma clave
+def _normalize(value, digits):
+    if isinstance(value, (bool, np.bool_)) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(f'{float(value):.{digits}g}')
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        return ('array', value.shape, value.dtype.str, hashlib.sha1(value.tobytes()).hexdigest())
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(item, digits) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _normalize(item, digits)) for key, item in value.items()))
+    return value
+
+
+# copia de solo lectura de los arreglos del valor, sueltos o dentro de tuplas, listas, dicts y objetos.
+# Los DataFrames/Series no se tocan, se copian al leerlos (_copy_frames)
+def _freeze(value):
+    import pandas as pd
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value
+    if isinstance(value, np.ndarray):
+        value = value.copy()
+        value.flags.writeable = False
+        return value
+    if isinstance(value, tuple):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, list):
+        return [_freeze(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _freeze(item) for key, item in value.items()}
+    slots = [name for cls in type(value).__mro__ for name in getattr(cls, '__slots__', ())]
+    for name in slots + list(getattr(value, '__dict__', ())):
+        if hasattr(value, name):
+            setattr(value, name, _freeze(getattr(value, name)))
+    return value
+
+
+# pandas no tiene DataFrames de solo lectura: cada lectura recibe una copia (sueltos o dentro de tuplas)
+def _copy_frames(value):
+    import pandas as pd
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(_copy_frames(item) for item in value)
+    return value
+
+
+def scenario_key(namespace, params, digits=10):
+    return (namespace, _normalize(dict(params), digits))
+
+
+class ScenarioCache:
+    def __init__(self, maxsize=256, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return False, None
+
+    def _store(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    # devuelve el valor guardado para (namespace, params) o lo calcula con compute() y lo guarda
+    def get_or_compute(self, namespace, params, compute):
+        key = scenario_key(namespace, params)
+        found, value = self._lookup(key)
+        if not found:
+            # se calcula fuera del lock para no bloquear otras sesiones
+            value = _freeze(compute())
+            self._store(key, value)
+        return _copy_frames(value)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# instancia del proceso, la comparten todas las sesiones de Streamlit
+SCENARIOS = ScenarioCache()
@@ -0,0 +1,56 @@
+#reduccion de series largas al numero de puntos que realmente se pueden dibujar, conservando picos y
+#cierres del pozo. Las funciones devuelven los indices elegidos para tomar fechas y valores con ellos
+import numpy as np
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').astype(np.int64)
+    return np.nan_to_num(x.astype(float))
+
+
+# Largest-Triangle-Three-Buckets: un punto por bucket, el que forma el triangulo de mayor area con el
+# punto elegido en el bucket anterior y el promedio del bucket siguiente
+def lttb(x, y, n_out):
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x, y = _as_float(x), _as_float(y)
+
+    # n_out - 2 buckets entre el primer y el ultimo punto, que siempre se conservan
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    counts = np.diff(edges)
+    mean_x = np.append((cum_x[edges[1:]] - cum_x[edges[:-1]]) / counts, x[-1])
+    mean_y = np.append((cum_y[edges[1:]] - cum_y[edges[:-1]]) / counts, y[-1])
+
+    index = np.empty(n_out, dtype=np.int64)
+    index[0], index[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = mean_x[i + 1], mean_y[i + 1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        index[i + 1] = a
+    return index
+
+
+# Min/max por bucket: el minimo y el maximo de cada bucket, los extremos quedan garantizados
+def minmax(y, n_out):
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    y = _as_float(y)
+    n_buckets = (n_out - 2) // 2
+    bucket = np.arange(n) * n_buckets // n
+    starts = np.searchsorted(bucket, np.arange(n_buckets))
+    index = [[0, n - 1]]
+    for extreme in (np.minimum, np.maximum):
+        # primera posicion de cada bucket donde la serie alcanza su extremo
+        hits = np.flatnonzero(y == extreme.reduceat(y, starts)[bucket])
+        index.append(hits[np.unique(bucket[hits], return_index=True)[1]])
+    index = np.concatenate(index)
+    return np.unique(index)
@@ -0,0 +1,65 @@
+#curvas de declinacion de Arps (exponencial b = 0, hiperbolica 0 < b < 1, armonica b = 1) ajustadas a todos
+#los pozos a la vez: para cada b de la malla el modelo se linealiza (ln q o q^-b contra t) y la recta de
+#minimos cuadrados de cada pozo sale de sumas por pozo (np.bincount con pesos), sin un optimizador por
+#pozo. Se queda el b con menor error cuadratico en caudal
+import numpy as np
+
+B_GRID = np.round(np.linspace(0, 1, 21), 2)
+
+
+# q @ t con los parametros de Arps (Di en 1/unidad de t), acepta arreglos con broadcasting
+def arps_rate(t, qi, Di, b):
+    t, qi, Di, b = (np.asarray(value, dtype=float) for value in (t, qi, Di, b))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        hyperbolic = qi / (1 + b * Di * t) ** (1 / b)
+    return np.where(b == 0, qi * np.exp(-Di * t), hyperbolic)
+
+
+# nombre del modelo de cada b, None donde no hubo ajuste (b = NaN)
+def arps_model(b):
+    b = np.asarray(b, dtype=float)
+    names = np.where(b == 0, 'exponential', np.where(b == 1, 'harmonic', 'hyperbolic')).astype(object)
+    return np.where(np.isnan(b), None, names)
+
+
+# Ajuste de Arps de n_wells pozos: t, q son los puntos de todos los pozos y well el numero de pozo de cada
+# punto. Devuelve qi, Di, b, r2 y el numero de puntos por pozo (NaN si el pozo no declina o tiene < 3 puntos)
+def fit_arps(t, q, well, n_wells, b_grid=B_GRID):
+    t, q = np.asarray(t, dtype=float), np.asarray(q, dtype=float)
+    well = np.asarray(well)
+    if np.any(q <= 0):
+        raise ValueError("Rates must be positive to fit a decline curve")
+
+    def well_sum(x):
+        return np.bincount(well, weights=x, minlength=n_wells)
+
+    counts = np.bincount(well, minlength=n_wells)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_t = well_sum(t) / counts
+        dt = t - mean_t[well]
+        stt = well_sum(dt * dt)
+        mean_q = well_sum(q) / counts
+        sst = well_sum((q - mean_q[well]) ** 2)
+
+    best = {name: np.full(n_wells, np.nan) for name in ('qi', 'Di', 'b')}
+    best_sse = np.full(n_wells, np.inf)
+    for b in b_grid:
+        y = np.log(q) if b == 0 else q ** -b
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            mean_y = well_sum(y) / counts
+            slope = well_sum(dt * (y - mean_y[well])) / stt
+            intercept = mean_y - slope * mean_t
+            if b == 0:
+                qi, Di = np.exp(intercept), -slope
+            else:
+                qi, Di = intercept ** (-1 / b), slope / (intercept * b)
+            sse = well_sum((q - arps_rate(t, qi[well], Di[well], b)) ** 2)
+        better = (counts >= 3) & (qi > 0) & (Di > 0) & np.isfinite(qi) & np.isfinite(sse) & (sse < best_sse)
+        best_sse = np.where(better, sse, best_sse)
+        for name, value in (('qi', qi), ('Di', Di), ('b', b)):
+            best[name] = np.where(better, value, best[name])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        best['r2'] = np.where(np.isfinite(best_sse), 1 - best_sse / sst, np.nan)
+    best['points'] = counts
+    return best
@@ -0,0 +1,158 @@
+#modo probabilistico (Monte Carlo): los parametros inciertos se muestrean con numpy.random.Generator y
+#AOF, Qo, J de Darcy y el punto de operacion nodal se evaluan con las funciones vectorizadas, por bloques
+#de chunk_size realizaciones para que la memoria de los calculos intermedios no crezca con n.
+#Percentiles con la convencion de excedencia: P90 (bajo) <= P50 <= P10 (alto)
+import numpy as np
+from potencial_yac import j_darcy, aof_vec, Qo_vec
+from analisis_nodal import operating_point
+
+# parametro -> (distribucion, *argumentos de numpy.random.Generator), ej. {'pr': ('normal', 3000, 150)}.
+# Un escalar deja el parametro fijo
+DISTRIBUTIONS = {
+    'normal': lambda rng, n, mean, sd: rng.normal(mean, sd, n),
+    'lognormal': lambda rng, n, mu, sigma: rng.lognormal(mu, sigma, n),
+    'uniform': lambda rng, n, low, high: rng.uniform(low, high, n),
+    'triangular': lambda rng, n, low, mode, high: rng.triangular(low, mode, high, n),
+}
+
+# limites fisicos, las muestras de colas abiertas (normal) se recortan a estos rangos
+BOUNDS = {'wc': (0.0, 1.0), 'ef': (0.0, None), 'pr': (0.0, None), 'pb': (0.0, None), 'ko': (0.0, None),
+          'h': (0.0, None), 'C': (1e-6, None), 'ID': (1e-6, None), 'THP': (0.0, None)}
+
+# salida -> parametros que necesita
+OUTPUTS = {
+    'AOF': ('q_test', 'pwf_test', 'pr', 'pb'),
+    'Qo': ('q_test', 'pwf_test', 'pr', 'pb', 'pwf'),
+    'J_darcy': ('ko', 'h', 'bo', 'uo', 're', 'rw', 's'),
+    'Q_op': ('q_test', 'pwf_test', 'pr', 'pb', 'THP', 'API', 'wc', 'sg_h2o', 'ID', 'tvd', 'md'),
+    'Pwf_op': ('q_test', 'pwf_test', 'pr', 'pb', 'THP', 'API', 'wc', 'sg_h2o', 'ID', 'tvd', 'md'),
+}
+
+
+def sample(spec, n, rng):
+    params = {}
+    for name, value in spec.items():
+        if isinstance(value, tuple):
+            if value[0] not in DISTRIBUTIONS:
+                raise ValueError(f"Unknown distribution for {name}: {value[0]}")
+            values = DISTRIBUTIONS[value[0]](rng, n, *value[1:])
+            lo, hi = BOUNDS.get(name, (None, None))
+            params[name] = np.clip(values, lo, hi) if lo is not None or hi is not None else values
+        else:
+            params[name] = value
+    return params
+
+
+# Salidas pedidas para un bloque de parametros (arreglos de realizaciones o escalares)
+def evaluate(params, outputs):
+    missing = {name for output in outputs for name in OUTPUTS[output] if name not in params}
+    if missing:
+        raise ValueError(f"Missing parameters: {', '.join(sorted(missing))}")
+    p = params
+    ef, ef2 = p.get('ef', 1), p.get('ef2')
+    results = {}
+    if 'AOF' in outputs:
+        results['AOF'] = aof_vec(p['q_test'], p['pwf_test'], p['pr'], p['pb'], ef, ef2)
+    if 'Qo' in outputs:
+        results['Qo'] = Qo_vec(p['q_test'], p['pwf_test'], p['pr'], p['pwf'], p['pb'], ef, ef2)
+    if 'J_darcy' in outputs:
+        results['J_darcy'] = j_darcy(p['ko'], p['h'], p['bo'], p['uo'], p['re'], p['rw'], p['s'])
+    if 'Q_op' in outputs or 'Pwf_op' in outputs:
+        q_op, pwf_op = operating_point(p['q_test'], p['pwf_test'], p['pr'], p['pb'], p['THP'], p['API'],
+                                       p['wc'], p['sg_h2o'], p['ID'], p['tvd'], p['md'], p.get('C', 120))
+        results['Q_op'], results['Pwf_op'] = q_op, pwf_op
+    return {output: results[output] for output in outputs}
+
+
+def _default_outputs(spec):
+    return tuple(output for output, needed in OUTPUTS.items() if all(name in spec for name in needed))
+
+
+# Resultado: muestras de los parametros inciertos y de cada salida (n realizaciones)
+class MonteCarloResult:
+    __slots__ = ('inputs', 'outputs')
+
+    def __init__(self, inputs, outputs):
+        self.inputs = inputs
+        self.outputs = outputs
+
+    def __len__(self):
+        return len(next(iter(self.outputs.values())))
+
+    # {salida: {'P90': .., 'P50': .., 'P10': .., 'mean': ..}}, los NaN (pozo sin flujo) se ignoran
+    def percentiles(self):
+        bands = {}
+        for output, values in self.outputs.items():
+            flowing = values[~np.isnan(values)]
+            p90, p50, p10 = np.percentile(flowing, [10, 50, 90]) if flowing.size else (np.nan,) * 3
+            bands[output] = {'P90': p90, 'P50': p50, 'P10': p10, 'mean': flowing.mean() if flowing.size else np.nan,
+                             'no_flow': 1 - flowing.size / values.size}
+        return bands
+
+    def summary(self):
+        import pandas as pd
+
+        return pd.DataFrame(self.percentiles()).T
+
+    # sensibilidad por rangos (Spearman) de cada salida contra cada parametro incierto
+    def rank_correlation(self, output):
+        y = self.outputs[output]
+        ok = ~np.isnan(y)
+        ry = np.argsort(np.argsort(y[ok]))
+        return {name: float(np.corrcoef(np.argsort(np.argsort(x[ok])), ry)[0, 1]) for name, x in self.inputs.items()}
+
+
+def monte_carlo(spec, n=100_000, outputs=None, chunk_size=50_000, seed=None):
+    rng = np.random.default_rng(seed)
+    outputs = tuple(outputs or _default_outputs(spec))
+    if not outputs:
+        raise ValueError("No output can be evaluated with the given parameters")
+    uncertain = [name for name, value in spec.items() if isinstance(value, tuple)]
+    inputs = {name: np.empty(n) for name in uncertain}
+    results = {output: np.empty(n) for output in outputs}
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        params = sample(spec, stop - start, rng)
+        for name in uncertain:
+            inputs[name][start:stop] = params[name]
+        # realizaciones no fisicas (ej. pr < pwf_test) quedan como NaN
+        with np.errstate(invalid='ignore', divide='ignore'):
+            chunk = evaluate(params, outputs)
+        for output, values in chunk.items():
+            results[output][start:stop] = values
+    return MonteCarloResult(inputs, results)
+
+
+# Tornado: cada parametro incierto se lleva a su P90 y P10 con los demas en P50, las 2k + 1 corridas se
+# evaluan juntas en un solo arreglo. Filas ordenadas por el ancho de la barra (swing)
+def tornado(spec, output, n=20_000, seed=None):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    samples = sample(spec, n, rng)
+    uncertain = [name for name, value in spec.items() if isinstance(value, tuple)]
+    if not uncertain:
+        raise ValueError("No uncertain parameters in spec")
+    levels = {name: np.percentile(samples[name], [10, 50, 90]) for name in uncertain}
+
+    k = len(uncertain)
+    params = dict(spec)
+    for name in uncertain:
+        params[name] = np.full(2 * k + 1, levels[name][1])
+    for i, name in enumerate(uncertain):
+        params[name][2 * i] = levels[name][0]
+        params[name][2 * i + 1] = levels[name][2]
+    values = evaluate(params, (output,))[output]
+    base = values[-1]
+
+    df = pd.DataFrame({
+        'parameter': uncertain,
+        'low': [levels[name][0] for name in uncertain],
+        'high': [levels[name][2] for name in uncertain],
+        f'{output} @ low': values[0:2 * k:2],
+        f'{output} @ high': values[1:2 * k:2],
+    })
+    df['swing'] = (df[f'{output} @ high'] - df[f'{output} @ low']).abs()
+    df.attrs['base'] = base
+    return df.sort_values('swing', ascending=False, ignore_index=True)
@@ -0,0 +1,187 @@
+#asignacion de gas de levantamiento: la respuesta caudal de petroleo vs gas inyectado de cada pozo se
+#precalcula de una vez (punto de operacion IPR compuesta / VLP de Beggs & Brill con el gas inyectado
+#sumado en el fondo de la tuberia) y el presupuesto de gas se reparte por incrementos iguales con el criterio
+#de igual caudal marginal sobre la envolvente concava de cada curva, usando heaps: O(K log N) para K
+#incrementos. Si cambia la prueba de un pozo solo se recalcula su curva y se corrige la asignacion con
+#intercambios, sin recalcular el campo. Las curvas reales no son concavas (por debajo del gas de arranque el
+#pozo no produce): si el reparto queda dentro de un tramo de la envolvente, donde la curva real esta por
+#debajo, se resuelve el reparto exacto sobre las curvas reales (programacion dinamica por pozo)
+import heapq
+import numpy as np
+from analisis_nodal import operating_point
+
+
+# Qo(bpd) de cada pozo (filas) para cada caudal de gas inyectado en Mscf/d (columnas). gor en scf/stb,
+# **fluid son los datos del fluido de vlp_multifasico.traverse_beggs_brill
+def gas_lift_response(q_test, pwf_test, pr, pb, THP, API, wc, sg_h2o, ID, tvd, md, gas, gor=400, **fluid):
+    from vlp_multifasico import traverse_beggs_brill
+
+    wells = np.broadcast_arrays(*(np.atleast_1d(np.asarray(value, dtype=float)) for value in (
+        q_test, pwf_test, pr, pb, THP, API, wc, sg_h2o, ID, tvd, md, gor)))
+    q_test, pwf_test, pr, pb, THP, API, wc, sg_h2o, ID, tvd, md, gor = (value[:, None] for value in wells)
+    gas = np.asarray(gas, dtype=float)[None, :]
+    THP = np.broadcast_to(THP, (THP.shape[0], gas.shape[1]))
+
+    # GOR total @ Q: la del yacimiento mas el gas inyectado repartido en el petroleo producido. Por debajo de
+    # 1 bpd se usa la VLP de 1 bpd (con Q = 0 la columna quedaria llena de liquido estatico)
+    def vlp(Q, THP, API, wc, sg_h2o, ID, tvd, md):
+        Q = np.maximum(Q, 1.0)
+        oil = np.maximum(Q * (1 - wc), 1e-3)
+        return traverse_beggs_brill(Q, THP, API, wc, sg_h2o, ID, tvd, md, gor=gor + 1000 * gas / oil, **fluid)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        q, _ = operating_point(q_test, pwf_test, pr, pb, THP, API, wc, sg_h2o, ID, tvd, md, vlp=vlp)
+    return np.nan_to_num(q, nan=0.0) * (1 - wc)
+
+
+# envolvente concava superior de cada curva (malla uniforme), asi los caudales marginales no crecen y el
+# reparto voraz por incrementos es optimo
+def concave_envelope(rates):
+    rates = np.atleast_2d(np.asarray(rates, dtype=float))
+    envelope = np.empty_like(rates)
+    x = np.arange(rates.shape[1])
+    for i, y in enumerate(rates):
+        hull = [0]
+        for k in range(1, len(y)):
+            while len(hull) >= 2 and ((y[hull[-1]] - y[hull[-2]]) * (k - hull[-2])
+                                      <= (y[k] - y[hull[-2]]) * (hull[-1] - hull[-2])):
+                hull.pop()
+            hull.append(k)
+        envelope[i] = np.interp(x, hull, y[hull])
+    return envelope
+
+
+# rates: matriz pozos x niveles de gas (gas[k] = k * step), budget: gas total disponible (mismas unidades).
+# g_min/g_max por pozo en unidades de gas, se redondean al incremento
+class GasLiftAllocator:
+    __slots__ = ('rates', 'step', 'budget', 'levels', 'min_level', 'max_level', '_envelope', '_gain', '_version',
+                 '_add', '_remove')
+
+    def __init__(self, rates, step, budget, g_min=0.0, g_max=np.inf):
+        rates = np.array(np.atleast_2d(rates), dtype=float)
+        n, k = rates.shape
+        self.rates = rates
+        self.step = float(step)
+        self.budget = float(budget)
+        self._envelope = concave_envelope(rates)
+        self._gain = np.diff(self._envelope, axis=1)
+        self.min_level = np.broadcast_to(np.ceil(np.asarray(g_min, dtype=float) / step - 1e-9), (n,)).astype(int)
+        self.max_level = np.minimum(np.broadcast_to(np.floor(np.asarray(g_max, dtype=float) / step + 1e-9),
+                                                    (n,)), k - 1).astype(int)
+        if np.any(self.min_level > self.max_level):
+            raise ValueError("g_min is above g_max or the response curve range")
+        if self.min_level.sum() * self.step > self.budget + 1e-9:
+            raise ValueError("The sum of g_min exceeds the gas budget")
+        self.levels = self.min_level.copy()
+        self._version = np.zeros(n, dtype=int)
+        self._add = []
+        self._remove = []
+        for well in range(n):
+            self._push(well)
+        self.allocate()
+
+    @property
+    def gas(self):
+        return self.levels * self.step
+
+    @property
+    def free(self):
+        return self.budget - self.levels.sum() * self.step
+
+    # ganancia de subir un nivel y perdida de bajar uno, con version para descartar entradas viejas
+    def _push(self, well):
+        level, version = self.levels[well], self._version[well]
+        if level < self.max_level[well]:
+            heapq.heappush(self._add, (-self._gain[well, level], well, version))
+        if level > self.min_level[well]:
+            heapq.heappush(self._remove, (self._gain[well, level - 1], well, version))
+
+    def _peek(self, heap):
+        while heap and heap[0][2] != self._version[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def _move(self, well, delta):
+        self.levels[well] += delta
+        self._version[well] += 1
+        self._push(well)
+
+    # reparto voraz del gas libre y luego intercambios mientras algun pozo gane mas de lo que otro pierde.
+    # El resultado es optimo para la envolvente, que acota por arriba a las curvas reales: si en los niveles
+    # elegidos la curva real coincide con la envolvente tambien es optimo para las curvas reales, si no se
+    # resuelve el reparto exacto
+    def allocate(self, tol=1e-9):
+        while True:
+            add = self._peek(self._add)
+            if add is None or -add[0] <= tol:
+                break
+            if self.free >= self.step - 1e-9:
+                self._move(add[1], 1)
+                continue
+            remove = self._peek(self._remove)
+            if remove is None or remove[1] == add[1] or -add[0] <= remove[0] + tol:
+                break
+            self._move(remove[1], -1)
+            self._move(add[1], 1)
+
+        wells = np.arange(len(self.levels))
+        envelope = self._envelope[wells, self.levels].sum()
+        if self.total_rate() < envelope - tol * (1 + abs(envelope)):
+            self._allocate_exact()
+        return self
+
+    # reparto exacto sobre las curvas reales: mejor caudal con a lo sumo b incrementos agregando un pozo por
+    # vez (mochila de eleccion multiple), O(N K B) con N pozos, K niveles y B incrementos del presupuesto
+    def _allocate_exact(self):
+        n, k = self.rates.shape
+        units = int(min(np.floor(self.budget / self.step + 1e-9), self.max_level.sum()))
+        best = np.zeros(units + 1)
+        choice = np.empty((n, units + 1), dtype=int)
+        for well in range(n):
+            new = np.full(units + 1, -np.inf)
+            for level in range(self.min_level[well], self.max_level[well] + 1):
+                if level > units:
+                    break
+                candidate = best[:units + 1 - level] + self.rates[well, level]
+                better = candidate > new[level:]
+                new[level:] = np.where(better, candidate, new[level:])
+                choice[well, level:] = np.where(better, level, choice[well, level:])
+            best = new
+
+        b = units
+        for well in range(n - 1, -1, -1):
+            self.levels[well] = choice[well, b]
+            b -= self.levels[well]
+        # las entradas de los heaps quedan viejas: se rehacen con los niveles nuevos
+        self._version += 1
+        self._add, self._remove = [], []
+        for well in range(n):
+            self._push(well)
+
+    # nueva curva (y limites) de un pozo: se le quita su gas y se reoptimiza solo con intercambios.
+    # Se valida todo antes de tocar el estado, un error deja la asignacion anterior intacta
+    def update_well(self, well, rates, g_min=None, g_max=None):
+        rates = np.asarray(rates, dtype=float)
+        if rates.shape != self.rates.shape[1:]:
+            raise ValueError("The response curve must use the same gas levels")
+        envelope = concave_envelope(rates)[0]
+        min_level = self.min_level[well] if g_min is None else int(np.ceil(g_min / self.step - 1e-9))
+        max_level = (self.max_level[well] if g_max is None
+                     else min(int(np.floor(g_max / self.step + 1e-9)), self._gain.shape[1]))
+        if min_level > max_level:
+            raise ValueError("g_min is above g_max or the response curve range")
+        if self.free + (self.levels[well] - min_level) * self.step < -1e-9:
+            raise ValueError("The sum of g_min exceeds the gas budget")
+        self.rates[well] = rates
+        self._envelope[well] = envelope
+        self._gain[well] = np.diff(envelope)
+        self.min_level[well] = min_level
+        self.max_level[well] = max_level
+        self.levels[well] = min_level
+        self._version[well] += 1
+        self._push(well)
+        return self.allocate()
+
+    # caudal total del campo con la asignacion actual, sobre las curvas reales
+    def total_rate(self):
+        return self.rates[np.arange(len(self.levels)), self.levels].sum()
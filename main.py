@@ -3,8 +3,15 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from PIL import Image
-from potencial_yac import IPR_curve_methods, Qo, Qb, aof, j
-from analisis_nodal import pwf_darcy, pwf_vogel, f_darcy, sg_oil, sg_avg, gradient_avg
+from potencial_yac import IPRModel, ipr_curve, plot_ipr
+from analisis_nodal import operating_point
+from pipeline_nodal import NodalPipeline
+from volve import load_production, ProductionIndex
+from declinacion import arps_rate
+from cache_escenarios import SCENARIOS
+from incertidumbre import monte_carlo, tornado
+from petrofisica import load_las, evaluate_well
+from pvt import pvt_table
 import base64
 
 def image_to_base64(img):
@@ -19,6 +26,42 @@ icon_base64 = image_to_base64(icon)
 st.set_page_config(page_title="Project-2 App", page_icon=icon, layout="wide")
 rofer=Image.open('Rofer_corporation.png')
 
+
+# Figura de matplotlib como PNG, asi el cache guarda la imagen y no vuelve a rasterizarla
+def figura_png(fig):
+    from io import BytesIO
+    buffer = BytesIO()
+    fig.savefig(buffer, format="PNG", bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def figura_ipr(curve):
+    fig, ax = plt.subplots(figsize=(20, 10))
+    plot_ipr(curve, ax=ax)
+    return figura_png(fig)
+
+
+def figura_nodal(df, q_op, pwf_op):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(df['Q(bpd)'], df['Pwf(psia)'], label='IPR', color='red')
+    ax.plot(df['Q(bpd)'], df['Po(psia)'], label='VLP', color='green')
+    ax.plot(df['Q(bpd)'], df['Psys(psia)'], label='Curva del Sistema', color='blue')
+    if not np.isnan(q_op):
+        ax.plot(q_op, pwf_op, 'ko', label='Punto de Operación')
+    ax.set_xlabel('Tasa de Flujo (Q) [bpd]')
+    ax.set_ylabel('Presión (Pwf) [psia]')
+    ax.legend()
+    ax.grid()
+    return figura_png(fig)
+
+
+# Un solo indice de produccion por contenido de archivo, compartido entre reruns y sesiones
+@st.cache_resource(show_spinner="Leyendo archivo...")
+def cargar_produccion(data):
+    return ProductionIndex(load_production(data))
+
+
 # Menú lateral
 if "opcion" not in st.session_state:
     st.session_state["opcion"] = "Información del Proyecto"
@@ -44,6 +87,9 @@ with st.sidebar:
     if st.button(":chart_with_upwards_trend: Análisis Nodal"):
         st.session_state["opcion"] = "Análisis Nodal"
 
+    # Se llena al final, despues de que la pagina consulta el cache en esta misma corrida
+    cache_caption = st.empty()
+
 # Renderizar la página seleccionada
 opcion = st.session_state["opcion"]
 
@@ -73,50 +119,64 @@ elif opcion == "Campo VOLVE":
 
     uploaded_file = st.file_uploader("Carga tu archivo de Excel con datos de producción del campo VOLVE", type="xlsx")
     if uploaded_file is not None:
-        data = pd.read_excel(uploaded_file)
+        produccion = cargar_produccion(uploaded_file.getvalue())
 
         st.write("Vista previa de los datos cargados:")
-        st.dataframe(data.head())
+        st.dataframe(produccion.data.head())
 
-        wells = data['WELL_BORE_CODE'].unique()
-        selected_well = st.selectbox("Selecciona un pozo para graficar:", wells)
+        st.write("Resumen por pozo:")
+        st.dataframe(produccion.summary)
 
-        well_data = data[data['WELL_BORE_CODE'] == selected_well]
+        # Ajuste de Arps de todos los pozos en una pasada, guardado en el indice del archivo
+        declinacion = produccion.decline()
+        st.write("Curvas de declinación (Arps, Di en 1/día desde el pico de producción):")
+        st.dataframe(declinacion)
 
-        well_data['DATEPRD'] = pd.to_datetime(well_data['DATEPRD'], errors='coerce')
+        selected_well = st.selectbox("Selecciona un pozo para graficar:", produccion.wells)
 
-        well_data = well_data.sort_values(by='DATEPRD')
+        # Series reducidas al ancho del grafico (10 in x 100 dpi), guardadas por pozo en el indice
+        fechas_o, qo = produccion.decimated(selected_well, 'BORE_OIL_VOL', n_out=1000)
+        fechas_w, qw = produccion.decimated(selected_well, 'BORE_WAT_VOL', n_out=1000)
 
         # Graficar Qo vs t
         st.subheader("Gráfico: Qo vs t (año)")
         plt.figure(figsize=(10, 5))
-        plt.plot(well_data['DATEPRD'], well_data['BORE_OIL_VOL'], label='Qo (Producción de Petróleo)', color='blue')
+        plt.plot(fechas_o, qo, label='Qo (Producción de Petróleo)', color='blue')
+        ajuste = declinacion.loc[selected_well]
+        if not np.isnan(ajuste['b']):
+            fechas_ajuste = pd.date_range(ajuste['t0'], produccion.summary.loc[selected_well, 'last_date'], periods=200)
+            dias = (fechas_ajuste - ajuste['t0']) / pd.Timedelta(days=1)
+            plt.plot(fechas_ajuste, arps_rate(dias, ajuste['qi'], ajuste['Di'], ajuste['b']),
+                     label=f"Arps {ajuste['model']} (b = {ajuste['b']:.2f})", color='red', linestyle='--')
         plt.xlabel('Fecha')
         plt.ylabel('Volumen de Petróleo (Qo)')
         plt.title(f'Producción de Petróleo para el Pozo {selected_well}')
         plt.legend()
         st.pyplot(plt)
+        plt.close()
 
         # Graficar Qw vs t
         st.subheader("Gráfico: Qw vs t (año)")
         plt.figure(figsize=(10, 5))
-        plt.plot(well_data['DATEPRD'], well_data['BORE_WAT_VOL'], label='Qw (Producción de Agua)', color='green')
+        plt.plot(fechas_w, qw, label='Qw (Producción de Agua)', color='green')
         plt.xlabel('Fecha')
         plt.ylabel('Volumen de Agua (Qw)')
         plt.title(f'Producción de Agua para el Pozo {selected_well}')
         plt.legend()
         st.pyplot(plt)
+        plt.close()
 
         # Graficar Qo y Qw juntos
         st.subheader("Gráfico: Qo y Qw vs t (año)")
         plt.figure(figsize=(10, 5))
-        plt.plot(well_data['DATEPRD'], well_data['BORE_OIL_VOL'], label='Qo (Producción de Petróleo)', color='blue')
-        plt.plot(well_data['DATEPRD'], well_data['BORE_WAT_VOL'], label='Qw (Producción de Agua)', color='green')
+        plt.plot(fechas_o, qo, label='Qo (Producción de Petróleo)', color='blue')
+        plt.plot(fechas_w, qw, label='Qw (Producción de Agua)', color='green')
         plt.xlabel('Fecha')
         plt.ylabel('Volumen (Qo y Qw)')
         plt.title(f'Producción de Petróleo y Agua para el Pozo {selected_well}')
         plt.legend()
         st.pyplot(plt)
+        plt.close()
     else:
         st.write("Por favor, carga un archivo de Excel para comenzar.")
 
@@ -130,28 +190,55 @@ elif opcion == "Cálculos Petrofísicos":
     pwf_test = st.number_input("Presión de fondo fluyente durante la prueba (psia)", value=3000.0)
     pr = st.number_input("Presión inicial del yacimiento (psia)", value=4000.0)
     pb = st.number_input("Presión de burbuja (psia)", value=2500.0)
-    ko = st.number_input("Permeabilidad (mD)", value=50.0)
-    h = st.number_input("Altura neta productiva (ft)", value=50.0)
-    bo = st.number_input("Factor de volumen del petróleo (rb/stb)", value=1.2)
-    uo = st.number_input("Viscosidad del petróleo (cp)", value=2.0)
+    # ko y h por defecto desde un registro LAS si se carga uno
+    ko_default, h_default = 50.0, 50.0
+    archivo_las = st.file_uploader("Registro LAS (opcional)", type=["las", "LAS"])
+    if archivo_las is not None:
+        try:
+            _, resumen = evaluate_well(load_las(archivo_las))
+        except ValueError as error:
+            st.warning(str(error))
+        else:
+            st.write(pd.DataFrame([resumen]).set_index('well'))
+            if resumen['h(ft)'] > 0:
+                ko_default, h_default = float(resumen['ko(mD)']), float(resumen['h(ft)'])
+    ko = st.number_input("Permeabilidad (mD)", value=ko_default)
+    h = st.number_input("Altura neta productiva (ft)", value=h_default)
+    # Bo y μo por defecto desde las tablas PVT a la presion del yacimiento
+    bo_default, uo_default = 1.2, 2.0
+    with st.expander("Bo y μo desde correlaciones PVT"):
+        usar_pvt = st.checkbox("Calcular Bo y μo @ Pr")
+        api_pvt = st.number_input("Gravedad API", value=30.0)
+        sg_gas_pvt = st.number_input("Gravedad específica del gas", value=0.65)
+        gor_pvt = st.number_input("GOR de producción (scf/stb)", value=400.0)
+        t_pvt = st.number_input("Temperatura del yacimiento (°F)", value=180.0)
+        correlacion = st.selectbox("Correlación Rs/Bo", ["standing", "vasquez_beggs"])
+        if usar_pvt:
+            rs_pvt, bo_pvt, uo_pvt = pvt_table(api_pvt, sg_gas_pvt, correlacion).oil(pr, t_pvt, gor_pvt)
+            st.write(f"Rs = {float(rs_pvt):.1f} scf/stb, Bo = {float(bo_pvt):.4f} rb/stb, μo = {float(uo_pvt):.3f} cp")
+            bo_default, uo_default = float(bo_pvt), float(uo_pvt)
+    bo = st.number_input("Factor de volumen del petróleo (rb/stb)", value=bo_default)
+    uo = st.number_input("Viscosidad del petróleo (cp)", value=uo_default)
     re = st.number_input("Radio de drenaje (ft)", value=1000.0)
     rw = st.number_input("Radio del pozo (ft)", value=0.5)
     s = st.number_input("Skin (daño en la formación)", value=0.0)
     metodo = st.selectbox("Método para cálculo de Qo", ["Darcy", "Vogel", "Standing", "IPR_compuesto"])
 
-    pwf_array = np.arange(pr, 0, -400)
-
     if st.button("Calcular"):
         with st.spinner("Calculando..."):
             st.subheader("Curva IPR (Influencia Presión - Producción)")
-            IPR_curve_methods(q_test, pwf_test, pr, pwf_array, pb, method=metodo)
-            st.pyplot(plt)
+            # Escenarios ya calculados (en esta u otra sesion) salen del cache
+            params = dict(q_test=q_test, pwf_test=pwf_test, pr=pr, pb=pb, metodo=metodo)
+            curve = SCENARIOS.get_or_compute('ipr_curve', params,
+                                             lambda: ipr_curve(q_test, pwf_test, pr, pb, method=metodo))
+            st.image(SCENARIOS.get_or_compute('ipr_figure', params, lambda: figura_ipr(curve)))
 
+            ipr = SCENARIOS.get_or_compute('ipr_model', params, lambda: IPRModel(q_test, pwf_test, pr, pb))
             st.write("### Resultados:")
-            st.write(f"- Índice de productividad (J): {j(q_test, pwf_test, pr, pb):.4f} stb/d/psi")
-            st.write(f"- Caudal al punto de burbuja (Qb): {Qb(q_test, pwf_test, pr, pb):.2f} bpd")
-            st.write(f"- Caudal máximo de producción (AOF): {aof(q_test, pwf_test, pr, pb):.2f} bpd")
-            st.write(f"- Caudal Qo (bpd) según {metodo}: {Qo(q_test, pwf_test, pr, 2000, pb):.2f} bpd")
+            st.write(f"- Índice de productividad (J): {ipr.J:.4f} stb/d/psi")
+            st.write(f"- Caudal al punto de burbuja (Qb): {ipr.Qb:.2f} bpd")
+            st.write(f"- Caudal máximo de producción (AOF): {ipr.AOF:.2f} bpd")
+            st.write(f"- Caudal Qo (bpd) según {metodo}: {ipr.rate(2000):.2f} bpd")
 
 # Página 4: Análisis Nodal
 elif opcion == "Análisis Nodal":
@@ -176,31 +263,53 @@ elif opcion == "Análisis Nodal":
     if st.button("Calcular"):
         with st.spinner("Calculando..."):
             st.subheader("Resultados del Análisis Nodal")
-            columns = ['Q(bpd)', 'Pwf(psia)', 'THP(psia)', 'Pgravity(psia)', 'f', 'F(ft)', 'Pf(psia)', 'Po(psia)', 'Psys(psia)']
-            df = pd.DataFrame(columns=columns)
-
-            df[columns[0]] = np.linspace(0, 7500, 10)  # Rango de tasas de flujo
-            df[columns[1]] = df['Q(bpd)'].apply(lambda x: pwf_darcy(Qt, Pwft, x, Pr, Pb))
-            df[columns[2]] = THP
-            df[columns[3]] = gradient_avg(API, wc, sg_h2o) * tvd
-            df[columns[4]] = df['Q(bpd)'].apply(lambda x: f_darcy(x, ID, C))
-            df[columns[5]] = df['f'] * md
-            df[columns[6]] = gradient_avg(API, wc, sg_h2o) * df['F(ft)']
-            df[columns[7]] = df['THP(psia)'] + df['Pgravity(psia)'] + df['Pf(psia)']
-            df[columns[8]] = df['Po(psia)'] - df['Pwf(psia)']
+            params = dict(Qt=Qt, Pwft=Pwft, Pr=Pr, Pb=Pb, THP=THP, wc=wc, API=API, sg_h2o=sg_h2o, ID=ID, tvd=tvd,
+                          md=md, C=C)
+            # El pipeline de la sesion solo recalcula las columnas afectadas por los parametros que cambiaron
+            if "nodal_pipeline" not in st.session_state:
+                st.session_state["nodal_pipeline"] = NodalPipeline(q=np.linspace(0, 7500, 10))  # Rango de tasas de flujo
+            pipeline = st.session_state["nodal_pipeline"]
+            df = SCENARIOS.get_or_compute('nodal_table', params, lambda: pipeline.set(
+                q_test=Qt, pwf_test=Pwft, pr=Pr, pb=Pb, THP=THP, API=API, wc=wc, sg_h2o=sg_h2o, ID=ID, tvd=tvd,
+                md=md, C=C).table())
 
             # Mostrar tabla
             st.write("Tabla de resultados:")
             st.dataframe(df)
 
+            q_op, pwf_op = SCENARIOS.get_or_compute('operating_point', params, lambda: operating_point(
+                Qt, Pwft, Pr, Pb, THP, API, wc, sg_h2o, ID, tvd, md, C))
+            if np.isnan(q_op):
+                st.write("El pozo no fluye: la VLP está por encima de la presión del yacimiento.")
+            else:
+                st.write(f"- Punto de operación: Q = {q_op:.2f} bpd, Pwf = {pwf_op:.2f} psia")
+
             # Graficar resultados
             st.subheader("Gráficos del Análisis Nodal")
-            fig, ax = plt.subplots(figsize=(10, 6))
-            ax.plot(df['Q(bpd)'], df['Pwf(psia)'], label='IPR', color='red')
-            ax.plot(df['Q(bpd)'], df['Po(psia)'], label='VLP', color='green')
-            ax.plot(df['Q(bpd)'], df['Psys(psia)'], label='Curva del Sistema', color='blue')
-            ax.set_xlabel('Tasa de Flujo (Q) [bpd]')
-            ax.set_ylabel('Presión (Pwf) [psia]')
-            ax.legend()
-            ax.grid()
-            st.pyplot(fig)
+            st.image(SCENARIOS.get_or_compute('nodal_figure', params, lambda: figura_nodal(df, q_op, pwf_op)))
+
+    # Modo probabilístico: Pr, Pb, wc y C inciertos alrededor de los valores de arriba
+    with st.expander("Modo probabilístico (Monte Carlo)"):
+        sd_pr = st.number_input("Desviación estándar de Pr [psia]", value=150.0)
+        rango_pb = st.number_input("Rango de Pb (±) [psia]", value=200.0)
+        rango_wc = st.number_input("Rango de wc (±)", value=0.05)
+        rango_c = st.number_input("Rango de C (±)", value=15.0)
+        realizaciones = st.number_input("Número de realizaciones", value=100000, step=10000)
+        if st.button("Calcular incertidumbre"):
+            with st.spinner("Muestreando..."):
+                spec = dict(q_test=Qt, pwf_test=Pwft, pr=('normal', Pr, sd_pr),
+                            pb=('uniform', Pb - rango_pb, Pb + rango_pb), THP=THP, API=API,
+                            wc=('triangular', wc - rango_wc, wc, wc + rango_wc), sg_h2o=sg_h2o, ID=ID, tvd=tvd,
+                            md=md, C=('uniform', C - rango_c, C + rango_c))
+                params = dict(spec, n=realizaciones)
+                resultado = SCENARIOS.get_or_compute('monte_carlo', params, lambda: monte_carlo(
+                    spec, n=int(realizaciones), outputs=('AOF', 'Q_op', 'Pwf_op'), seed=0))
+                st.write("Percentiles (P90 bajo, P10 alto):")
+                st.dataframe(resultado.summary())
+                st.write("Tornado del caudal de operación:")
+                st.dataframe(SCENARIOS.get_or_compute('tornado', params, lambda: tornado(spec, 'Q_op', seed=0)))
+
+# Estado del cache de escenarios con las consultas de esta corrida
+cache_stats = SCENARIOS.stats()
+cache_caption.caption(f"Cache de escenarios: {cache_stats['hits']} aciertos, {cache_stats['misses']} fallos, "
+                      f"{cache_stats['size']}/{cache_stats['maxsize']} entradas")
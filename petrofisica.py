@@ -0,0 +1,203 @@
+#petrofisica desde registros LAS: cada archivo se parsea una sola vez (lasio) y sus curvas se guardan como
+#arreglos en un .npz nombrado con el hash del contenido, las lecturas siguientes cargan ese binario.
+#Vsh, porosidad, Sw de Archie y los cortes de zona productiva son operaciones vectorizadas sobre la
+#profundidad, y por pozo salen h neto y una permeabilidad (Timur) para j_darcy. Muchos pozos se procesan
+#en paralelo con un pool de procesos
+#   python petrofisica.py registros/*.las --workers 4
+import hashlib
+import io
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+CACHE_DIR = os.environ.get('LAS_CACHE_DIR',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_las'))
+
+# nombres de curva que se aceptan para cada registro, en orden de preferencia
+CURVE_ALIASES = {
+    'GR': ('GR', 'GR_EDTC', 'SGR', 'CGR', 'GRC'),
+    'RHOB': ('RHOB', 'RHOZ', 'DEN', 'ZDEN'),
+    'NPHI': ('NPHI', 'TNPH', 'NPOR', 'CNC'),
+    'RT': ('RT', 'ILD', 'RD', 'LLD', 'AT90', 'RDEP', 'RES_DEEP'),
+}
+
+# parametros por defecto: matriz arenisca, agua de formacion, Archie y cortes de zona productiva
+DEFAULTS = {
+    'rho_ma': 2.65, 'rho_f': 1.0, 'rw': 0.05, 'a': 1.0, 'm': 2.0, 'n': 2.0,
+    'gr_clean': None, 'gr_shale': None, 'vsh_cutoff': 0.4, 'phi_cutoff': 0.08, 'sw_cutoff': 0.6,
+    'top': None, 'base': None, 'swi': None, 'swi_window': 50.0,
+}
+
+
+def _read_bytes(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'getvalue'):  # st.file_uploader, BytesIO
+        return source.getvalue()
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+# Curvas de un LAS como {nombre: arreglo}, 'DEPT' en pies y 'WELL' con el nombre del pozo
+def load_las(source, cache_dir=CACHE_DIR):
+    data = _read_bytes(source)
+    path = os.path.join(cache_dir, hashlib.sha256(data).hexdigest() + '.npz')
+    if os.path.exists(path):
+        with np.load(path) as npz:
+            return {name: npz[name] for name in npz.files}
+
+    import lasio
+
+    las = lasio.read(io.StringIO(data.decode('utf-8', errors='replace')))
+    curves = {curve.mnemonic.upper(): np.asarray(curve.data, dtype=float) for curve in las.curves}
+    depth_name = las.curves[0].mnemonic.upper()
+    depth = curves.pop(depth_name)
+    if las.curves[0].unit.upper() in ('M', 'METER', 'METERS', 'METRES'):
+        depth = depth * 3.28084
+    curves['DEPT'] = depth
+    well = las.well['WELL'].value if 'WELL' in las.well else ''
+    curves['WELL'] = np.array(str(well) or os.path.splitext(getattr(source, 'name', str(source)))[0])
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # se escribe en un temporal y se renombra para que otro proceso nunca lea un archivo a medias
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **curves)
+    os.replace(tmp_path, path)
+    return curves
+
+
+def _curve(curves, name):
+    for alias in CURVE_ALIASES[name]:
+        if alias in curves:
+            return curves[alias]
+    return None
+
+
+# Vsh lineal con el indice de gamma ray, GR limpio/lutita por percentiles 5/95 si no se dan
+def shale_volume(gr, gr_clean=None, gr_shale=None):
+    if gr_clean is None:
+        gr_clean = np.nanpercentile(gr, 5)
+    if gr_shale is None:
+        gr_shale = np.nanpercentile(gr, 95)
+    return np.clip((gr - gr_clean) / (gr_shale - gr_clean), 0, 1)
+
+
+# Porosidad efectiva: densidad (y neutron-densidad si hay NPHI) corregida por arcilla
+def porosity(rhob, vsh, nphi=None, rho_ma=2.65, rho_f=1.0):
+    phi = (rho_ma - rhob) / (rho_ma - rho_f)
+    if nphi is not None:
+        phi = np.sqrt((phi ** 2 + nphi ** 2) / 2)
+    return np.clip(phi * (1 - vsh), 0, 0.5)
+
+
+# Sw de Archie
+def water_saturation(phi, rt, rw=0.05, a=1.0, m=2.0, n=2.0):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sw = (a * rw / (phi ** m * rt)) ** (1 / n)
+    return np.clip(np.where(phi > 0, sw, 1.0), 0, 1)
+
+
+# Permeabilidad de Timur (mD), phi y saturacion irreducible en fraccion
+def timur_permeability(phi, swi):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(swi > 0, 0.136 * (100 * phi) ** 4.4 / (100 * swi) ** 2, np.nan)
+
+
+# Swi de cada muestra: la Sw minima de la zona productiva dentro de +-window/2 pies (fuera de la zona de
+# transicion Sw = Swi), o la propia Sw si no hay zona productiva cerca
+def irreducible_saturation(depth, sw, pay, window=50.0):
+    step = np.nanmedian(np.abs(np.diff(depth))) if depth.size > 1 else 0.0
+    half = int(round(0.5 * window / step)) if step > 0 else 0
+    padded = np.pad(np.where(pay, sw, np.inf), half, constant_values=np.inf)
+    swi = np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1).min(axis=1)
+    return np.where(np.isfinite(swi), np.minimum(swi, sw), sw)
+
+
+# Registros calculados (arreglos sobre la profundidad) y resumen del pozo para j_darcy
+def evaluate_well(curves, **params):
+    p = dict(DEFAULTS, **params)
+    depth = curves['DEPT']
+    gr, rhob, nphi, rt = (_curve(curves, name) for name in ('GR', 'RHOB', 'NPHI', 'RT'))
+    if gr is None or rhob is None or rt is None:
+        raise ValueError("LAS file needs GR, RHOB and RT curves")
+
+    # espesor de cada muestra (mitad del intervalo hacia cada vecino)
+    thickness = np.abs(np.gradient(depth)) if depth.size > 1 else np.zeros_like(depth)
+    interval = np.ones(depth.shape, dtype=bool)
+    if p['top'] is not None:
+        interval &= depth >= p['top']
+    if p['base'] is not None:
+        interval &= depth <= p['base']
+
+    # GR limpio/lutita del intervalo evaluado
+    gr_clean = p['gr_clean'] if p['gr_clean'] is not None or not interval.any() else np.nanpercentile(gr[interval], 5)
+    gr_shale = p['gr_shale'] if p['gr_shale'] is not None or not interval.any() else np.nanpercentile(gr[interval], 95)
+    vsh = shale_volume(gr, gr_clean, gr_shale)
+    phi = porosity(rhob, vsh, nphi, p['rho_ma'], p['rho_f'])
+    sw = water_saturation(phi, rt, p['rw'], p['a'], p['m'], p['n'])
+    valid = interval & np.isfinite(vsh) & np.isfinite(phi) & np.isfinite(sw)
+    pay = valid & (vsh <= p['vsh_cutoff']) & (phi >= p['phi_cutoff']) & (sw <= p['sw_cutoff'])
+    # Timur usa la saturacion irreducible, no la Sw de Archie (en la zona de transicion Sw > Swi)
+    if p['swi'] is None:
+        swi = irreducible_saturation(depth, sw, pay, p['swi_window'])
+    else:
+        swi = np.broadcast_to(np.asarray(p['swi'], dtype=float), sw.shape)
+    k = timur_permeability(phi, swi)
+
+    h = thickness[pay].sum()
+    gross = thickness[valid].sum()
+    weights = thickness[pay]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        summary = {
+            'well': str(curves['WELL']),
+            'gross(ft)': gross,
+            'h(ft)': h,
+            'net_to_gross': h / gross if gross > 0 else np.nan,
+            'phi': np.average(phi[pay], weights=weights) if h > 0 else np.nan,
+            'sw': np.average(sw[pay], weights=weights) if h > 0 else np.nan,
+            'vsh': np.average(vsh[pay], weights=weights) if h > 0 else np.nan,
+            'swi': np.average(swi[pay], weights=weights) if h > 0 else np.nan,
+            # promedio aritmetico ponderado por espesor (capas en paralelo), el que usa j_darcy
+            'ko(mD)': np.average(k[pay], weights=weights) if h > 0 else np.nan,
+        }
+    logs = {'DEPT': depth, 'VSH': vsh, 'PHIE': phi, 'SW': sw, 'SWI': swi, 'K': k, 'PAY': pay}
+    return logs, summary
+
+
+def _process(args):
+    source, cache_dir, params = args
+    return evaluate_well(load_las(source, cache_dir), **params)[1]
+
+
+# Resumen de muchos pozos (una fila por archivo), en paralelo si processes > 1
+def process_wells(sources, processes=None, cache_dir=CACHE_DIR, **params):
+    import pandas as pd
+
+    tasks = [(source, cache_dir, params) for source in sources]
+    if processes and processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            rows = list(executor.map(_process, tasks, chunksize=max(1, len(tasks) // (4 * processes))))
+    else:
+        rows = [_process(task) for task in tasks]
+    return pd.DataFrame(rows).set_index('well') if rows else pd.DataFrame()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Net pay and permeability from LAS logs')
+    parser.add_argument('files', nargs='+', help='LAS files')
+    parser.add_argument('--workers', type=int, default=1, help='process pool size (default: 1)')
+    parser.add_argument('--output', help='write the summary to CSV')
+    args = parser.parse_args(argv)
+
+    summary = process_wells(args.files, processes=args.workers)
+    if args.output:
+        summary.to_csv(args.output)
+    else:
+        print(summary.to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#tabla nodal como un grafo perezoso de etapas con entradas declaradas: al cambiar un parametro solo se
+#recalculan las etapas que dependen de el (cambiar THP no recalcula la friccion, cambiar wc no recalcula
+#la IPR) y las demas columnas salen de los arreglos guardados
+import numpy as np
+from analisis_nodal import pwf_ipr, f_darcy, gradient_avg, NODAL_COLUMNS
+
+
+def _same(a, b):
+    try:
+        return np.array_equal(a, b)
+    except Exception:
+        return a is b
+
+
+class LazyGraph:
+    def __init__(self):
+        self._stages = {}
+        self._dependents = {}
+        self._values = {}
+        self.evaluations = {}
+
+    # registra una etapa: name = func(*inputs), las entradas pueden ser parametros u otras etapas
+    def add_stage(self, name, func, inputs):
+        self._stages[name] = (func, tuple(inputs))
+        self.evaluations[name] = 0
+        for source in inputs:
+            self._dependents.setdefault(source, []).append(name)
+
+    def _invalidate(self, name):
+        for dependent in self._dependents.get(name, ()):
+            if dependent in self._values:
+                del self._values[dependent]
+                self._invalidate(dependent)
+
+    # cambia parametros, solo se invalidan las etapas aguas abajo de los que cambiaron
+    def set(self, **params):
+        for name, value in params.items():
+            if name in self._stages:
+                raise ValueError(f"{name} is a stage, not a parameter")
+            if name in self._values and _same(self._values[name], value):
+                continue
+            self._values[name] = value
+            self._invalidate(name)
+        return self
+
+    def get(self, name):
+        if name not in self._values:
+            if name not in self._stages:
+                raise KeyError(f"Missing parameter: {name}")
+            func, inputs = self._stages[name]
+            self._values[name] = func(*(self.get(source) for source in inputs))
+            self.evaluations[name] += 1
+        return self._values[name]
+
+
+# Nodal analysis table as a DAG, same columns as analisis_nodal.nodal_table
+class NodalPipeline(LazyGraph):
+    def __init__(self, **params):
+        super().__init__()
+        self.add_stage('Q(bpd)', lambda q: np.asarray(q, dtype=float), ['q'])
+        self.add_stage('Pwf(psia)', lambda q_test, pwf_test, pr, pb, Q: pwf_ipr(q_test, pwf_test, Q, pr, pb),
+                       ['q_test', 'pwf_test', 'pr', 'pb', 'Q(bpd)'])
+        self.add_stage('THP(psia)', lambda THP, Q: np.full(Q.shape, THP, dtype=float), ['THP', 'Q(bpd)'])
+        self.add_stage('g_avg', gradient_avg, ['API', 'wc', 'sg_h2o'])
+        self.add_stage('Pgravity(psia)', lambda g_avg, tvd, Q: np.full(Q.shape, g_avg * tvd),
+                       ['g_avg', 'tvd', 'Q(bpd)'])
+        self.add_stage('f', f_darcy, ['Q(bpd)', 'ID', 'C'])
+        self.add_stage('F(ft)', lambda f, md: f * md, ['f', 'md'])
+        self.add_stage('Pf(psia)', lambda g_avg, F: g_avg * F, ['g_avg', 'F(ft)'])
+        self.add_stage('Po(psia)', lambda thp, p_gravity, p_f: thp + p_gravity + p_f,
+                       ['THP(psia)', 'Pgravity(psia)', 'Pf(psia)'])
+        self.add_stage('Psys(psia)', lambda po, pwf: po - pwf, ['Po(psia)', 'Pwf(psia)'])
+        self.set(q=np.linspace(0, 7500, 10), C=120)
+        self.set(**params)
+
+    def table(self):
+        import pandas as pd
+
+        return pd.DataFrame({column: self.get(column) for column in NODAL_COLUMNS})
@@ -0,0 +1,212 @@
+#IPR de pozos de gas con la pseudopresion m(p) = 2 int p / (mu z) dp: la tabla m(p) se construye una sola vez
+#por gas (sg_gas, T) con trapecios acumulados sobre z (Dranchuk-Abou-Kassem) y mu_g (Lee-Gonzalez-Eakin) de
+#pvt.py, y se invierte con interpolacion vectorizada (m crece con p). La entregabilidad es la forma LIT
+#m(pr) - m(pwf) = a q + b q^2 (b = 0 es Darcy, b es el termino no Darcy), con a de la prueba del pozo o,
+#sin prueba, a = 1 / J con J = j_gas(kg, h, ...) como j_darcy para el petroleo.
+#Las curvas salen como IPRCurve y las tablas nodales con las mismas columnas que las de petroleo
+import functools
+import numpy as np
+from pvt import z_dak, rho_gas, mu_gas
+from potencial_yac import IPRCurve
+from analisis_nodal import bracketed_root
+
+GAS_RATE = 'Qg(Mscf/d)'
+
+
+#indice de entregabilidad (Mscf/d por psi2/cp) desde la permeabilidad al gas, como j_darcy. Es 1 / a de la
+#forma LIT: se pasa como J= a las funciones de entregabilidad en lugar de la prueba
+def j_gas(kg, h, T, re, rw, s, flow_regime='seudocontinuo'):
+    if flow_regime == 'seudocontinuo':
+        return kg * h / (1422 * (T + 460) * (np.log(re / rw) - 0.75 + s))
+    if flow_regime == 'continuo':
+        return kg * h / (1422 * (T + 460) * (np.log(re / rw) + s))
+    raise ValueError(f"Unknown flow regime: {flow_regime}")
+
+
+# z, mu_g(cp) y m(psi2/cp) de un gas a temperatura fija sobre una malla uniforme de presion desde 0.
+# Presiones por encima de la malla son un error (np.interp devolveria el valor del borde)
+class GasTable:
+    __slots__ = ('p', 'z', 'mu', 'm', 'sg_gas', 'T')
+
+    def __init__(self, p, z, mu, m, sg_gas, T):
+        self.p = p
+        self.z = z
+        self.mu = mu
+        self.m = m
+        self.sg_gas = sg_gas
+        self.T = T
+
+    def _check(self, p):
+        if np.any(np.asarray(p) > self.p[-1]):
+            raise ValueError(f"Pressure above the gas table range ({self.p[-1]:.0f} psia)")
+
+    # m(p) en psi2/cp
+    def pseudo_pressure(self, p):
+        self._check(p)
+        return np.interp(p, self.p, self.m)
+
+    # p(psia) @ m, inversa de pseudo_pressure
+    def pressure(self, m):
+        return np.interp(m, self.m, self.p)
+
+    # z y mu_g(cp) @ p
+    def properties(self, p):
+        self._check(p)
+        return np.interp(p, self.p, self.z), np.interp(p, self.p, self.mu)
+
+
+@functools.lru_cache(maxsize=64)
+def _build_gas_table(sg_gas, T, p_max, dp):
+    p = np.arange(0.0, p_max + 0.5 * dp, dp)
+    z = z_dak(p, T, sg_gas)
+    mu = mu_gas(T, sg_gas, rho_gas(p, T, sg_gas, z))
+    integrand = 2 * p / (mu * z)
+    m = np.concatenate([[0.0], np.cumsum(0.5 * (integrand[1:] + integrand[:-1]) * np.diff(p))])
+    table = GasTable(p, z, mu, m, sg_gas, T)
+    for array in (p, z, mu, m):
+        array.flags.writeable = False
+    return table
+
+
+# Tabla de un gas (sg_gas y T en F escalares), se construye una vez por (sg_gas, T, malla) y queda en memoria
+def gas_table(sg_gas, T, p_max=20000.0, dp=5.0):
+    if np.size(sg_gas) != 1 or np.size(T) != 1:
+        raise ValueError("sg_gas and T must be scalars, one gas table per call")
+    if dp <= 0 or p_max <= dp:
+        raise ValueError("The pressure grid needs at least two points")
+    return _build_gas_table(round(float(sg_gas), 6), round(float(T), 6), float(p_max), float(dp))
+
+
+# Tabla que cubre la presion p (psia): la malla por defecto o una mas larga en multiplos de 10000 psia
+def _table_for(sg_gas, T, p):
+    p_max = np.nanmax(p, initial=0.0)
+    return gas_table(sg_gas, T, max(20000.0, 10000.0 * np.ceil(p_max / 10000.0)))
+
+
+# m(p) en psi2/cp
+def pseudo_pressure(p, sg_gas, T):
+    return _table_for(sg_gas, T, p).pseudo_pressure(p)
+
+
+# a de la forma LIT desde la prueba (q_test en Mscf/d) o desde J (j_gas), un valor por pozo
+def _lit_a(q_test, pwf_test, pr, table, b, J=None):
+    if J is not None:
+        J = np.asarray(J, dtype=float)
+        if np.any(~(J > 0)):
+            raise ValueError("The deliverability index J must be positive")
+        return 1 / J
+    q_test = np.asarray(q_test, dtype=float)
+    dm = table.pseudo_pressure(pr) - table.pseudo_pressure(pwf_test)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = (dm - b * q_test ** 2) / q_test
+    if np.any(~(a > 0)):
+        raise ValueError("The well test needs pwf_test < pr and a non-Darcy term below the total drawdown")
+    return a
+
+
+# Qg(Mscf/d) @ pwf, todos los argumentos menos sg_gas y T pueden ser arreglos (broadcasting).
+# Con J (j_gas) no se usa la prueba y q_test, pwf_test pueden ser None
+def qg_vec(q_test, pwf_test, pr, pwf, sg_gas, T, b=0.0, J=None):
+    table = _table_for(sg_gas, T, pr)
+    b = np.asarray(b, dtype=float)
+    a = _lit_a(q_test, pwf_test, pr, table, b, J)
+    dm = table.pseudo_pressure(pr) - table.pseudo_pressure(pwf)
+    # raiz positiva de b q^2 + a q - dm = 0 escrita sin cancelacion (vale tambien con b = 0)
+    with np.errstate(invalid='ignore'):
+        return 2 * dm / (a + np.sqrt(np.maximum(a ** 2 + 4 * b * dm, 0)))
+
+
+# AOF(Mscf/d), caudal con pwf = 0
+def aof_gas(q_test, pwf_test, pr, sg_gas, T, b=0.0, J=None):
+    return qg_vec(q_test, pwf_test, pr, 0.0, sg_gas, T, b, J)
+
+
+# Pwf(psia) @ Qg, inversa de qg_vec por la tabla m(p), NaN por encima del AOF
+def pwf_qg_vec(q_test, pwf_test, pr, rate, sg_gas, T, b=0.0, J=None):
+    table = _table_for(sg_gas, T, pr)
+    b = np.asarray(b, dtype=float)
+    rate = np.asarray(rate, dtype=float)
+    m_wf = table.pseudo_pressure(pr) - _lit_a(q_test, pwf_test, pr, table, b, J) * rate - b * rate ** 2
+    return np.where(m_wf > -1e-6 * table.m[-1], table.pressure(np.maximum(m_wf, 0)), np.nan)
+
+
+# IPR Curve de gas (compute only), pwf por defecto: `points` presiones entre Pr y 0
+def gas_ipr_curve(q_test, pwf_test, pr, sg_gas, T, b=0.0, pwf=None, points=500, J=None):
+    if pwf is None:
+        pwf = np.linspace(pr, 0, points)
+    pwf = np.asarray(pwf, dtype=float)
+    return IPRCurve(pwf, qg_vec(q_test, pwf_test, pr, pwf, sg_gas, T, b, J), None, None,
+                    float(aof_gas(q_test, pwf_test, pr, sg_gas, T, b, J)), 'Gas', GAS_RATE)
+
+
+# factor de friccion de Fanning: laminar o Swamee-Jain, rugosidad relativa
+def _fanning(n_re, relative_roughness):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        turbulent = 0.0625 / np.log10(relative_roughness / 3.7 + 5.74 / n_re ** 0.9) ** 2
+        return np.where(n_re <= 0, 0.0, np.where(n_re < 2000, 16 / n_re, turbulent))
+
+
+# Po(psia) @ Qg(Mscf/d) de una columna de gas seco con z y T promedio:
+# Po^2 = THP^2 e^s + 2.685e-3 f (z T q)^2 (e^s - 1) / (sen d^5), s = 0.0375 sg_gas tvd / (z T).
+# z y mu se leen de la tabla del gas a la temperatura media y se itera la presion media; la tabla se alarga
+# si la presion media pasa su rango.
+# Devuelve Po, Pgravity y Pf como traverse_beggs_brill
+def po_gas(Q, THP, sg_gas, ID, tvd, md, t_wh=100, t_bh=180, roughness=0.0006, tol=1e-4, maxiter=50):
+    Q, THP, ID, tvd, md = (np.array(arg, dtype=float) for arg in np.broadcast_arrays(Q, THP, ID, tvd, md))
+    if np.any(THP <= 0):
+        raise ValueError("THP must be positive")
+    if np.any(md < tvd):
+        raise ValueError("md must be greater than or equal to tvd")
+    t_avg = 0.5 * (t_wh + t_bh)
+    T = t_avg + 460
+
+    p_avg, po = THP, THP
+    for _ in range(maxiter):
+        z, mu = _table_for(sg_gas, t_avg, p_avg).properties(p_avg)
+        s = 0.0375 * sg_gas * tvd / (z * T)
+        f = _fanning(20.09 * sg_gas * Q / (ID * mu), roughness / (ID / 12))
+        # (e^s - 1) / sen = expm1(s) / s * 0.0375 sg_gas md / (z T), tambien para pozos horizontales
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = np.where(s > 0, np.expm1(s) / s, 1.0) * 0.0375 * sg_gas * md / (z * T)
+        po_new = np.sqrt(THP ** 2 * np.exp(s) + 2.685e-3 * f * (z * T * Q) ** 2 * growth / ID ** 5)
+        converged = np.all(np.abs(po_new - po) <= tol * po_new)
+        po, p_avg = po_new, 0.5 * (THP + po_new)
+        if converged:
+            break
+    else:
+        raise ValueError("Gas column average pressure did not converge")
+
+    p_static = THP * np.exp(0.5 * s)
+    return po, p_static - THP, po - p_static
+
+
+# Punto de operacion de pozos de gas: caudal (Mscf/d) y presion donde la IPR de gas corta la VLP de gas,
+# con broadcasting como analisis_nodal.operating_point. Q = NaN si la columna estatica supera Pr.
+# T es la temperatura del yacimiento (IPR), t_wh y t_bh las de cabeza y fondo de la tuberia (VLP)
+def gas_operating_point(q_test, pwf_test, pr, THP, sg_gas, T, ID, tvd, md, t_wh, t_bh, b=0.0, roughness=0.0006,
+                        J=None):
+    def residual(q):
+        return (pwf_qg_vec(q_test, pwf_test, pr, q, sg_gas, T, b, J)
+                - po_gas(q, THP, sg_gas, ID, tvd, md, t_wh, t_bh, roughness)[0])
+
+    q_max = aof_gas(q_test, pwf_test, pr, sg_gas, T, b, J)
+    shape = np.broadcast_shapes(*(np.shape(arg) for arg in (q_test, pwf_test, pr, THP, ID, tvd, md, b)))
+    q_op = bracketed_root(residual, np.zeros(shape), np.broadcast_to(q_max, shape))
+    return q_op, pwf_qg_vec(q_test, pwf_test, pr, q_op, sg_gas, T, b, J)
+
+
+# Nodal analysis table de gas @ Qg, columnas como analisis_nodal.nodal_table (Q en Mscf/d), sirve para
+# plot_nodal y plot_nodal_plotly
+GAS_NODAL_COLUMNS = [GAS_RATE, 'Pwf(psia)', 'THP(psia)', 'Pgravity(psia)', 'Pf(psia)', 'Po(psia)', 'Psys(psia)']
+
+def gas_nodal_table(q_test, pwf_test, pr, THP, sg_gas, T, ID, tvd, md, t_wh, t_bh, b=0.0, roughness=0.0006,
+                    q=None, J=None):
+    import pandas as pd
+
+    if q is None:
+        q = np.linspace(0, aof_gas(q_test, pwf_test, pr, sg_gas, T, b, J), 10)
+    q = np.asarray(q, dtype=float)
+    po, p_gravity, p_f = po_gas(q, THP, sg_gas, ID, tvd, md, t_wh, t_bh, roughness)
+    pwf = pwf_qg_vec(q_test, pwf_test, pr, q, sg_gas, T, b, J)
+    return pd.DataFrame(dict(zip(GAS_NODAL_COLUMNS, (q, pwf, np.broadcast_to(THP, q.shape), p_gravity, p_f, po,
+                                                     po - pwf))))
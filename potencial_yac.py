@@ -1,9 +1,7 @@
-#librerias
+#librerias, pandas/matplotlib/scipy solo se importan dentro de las funciones que grafican
+#para que los calculos no paguen ese tiempo de importacion
 
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.interpolate import make_interp_spline
 
 #primer paso, calculo del indice de productividad - cuando tengo presente permeabilidad y skin (daño)(s)
 # Productivity Index (darcy law)
@@ -111,6 +109,9 @@ def aof(q_test, pwf_test, pr, pb, ef=1, ef2=None):
             AOF = (q_test / (1.8 * ef * (1 - pwf_test / pr) - 0.8 * ef ** 2 * (
                         1 - pwf_test / pr) ** 2)) * (1.8 - 0.8 * ef2 ** 2)
 
+    else:
+        raise ValueError("Invalid combination of ef and ef2 values")
+
     return AOF
 
 
@@ -193,59 +194,353 @@ def Qo(q_test, pwf_test, pr, pwf, pb, ef=1, ef2=None):
     return qo
 
 
-#aqui solo es para la curvas IPR, compuestos, es decir para los 3 metodos, darcy, vogel, standing o IPR compuesto
-# IPR Curve
-def IPR_curve_methods(q_test, pwf_test, pr, pwf: list, pb, ef=1, ef2=None, method=None):
-    # Creating Dataframe
-    fig, ax = plt.subplots(figsize=(20, 10))
-    df = pd.DataFrame()
-    df['Pwf(psia)'] = pwf
+#versiones vectorizadas de las funciones anteriores, reciben arreglos de numpy (pwf o cualquier
+#otro parametro del pozo) y resuelven las ramas subsaturado/saturado y ef/ef2 con mascaras,
+#asi una curva completa se calcula de una sola vez en lugar de punto por punto.
+#ef2=None se representa con NaN para poder mezclar pozos con y sin ef2 en el mismo arreglo
+
+def _ef2_vec(ef2):
+    if ef2 is None:
+        return np.nan
+    return np.asarray(ef2, dtype=float)
+
+
+def _as_float(*args):
+    return tuple(np.asarray(arg, dtype=float) for arg in args)
+
+
+# Productivity Index (vectorized)
+def j_vec(q_test, pwf_test, pr, pb, ef=1, ef2=None):
+    q_test, pwf_test, pr, pb, ef = _as_float(q_test, pwf_test, pr, pb, ef)
+    ef2 = _ef2_vec(ef2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = pwf_test / pb
+        J_sub = q_test / (pr - pwf_test)  # Subsaturated reservoir
+        # Saturated reservoir, con ef = 1 se reduce a la forma de Vogel
+        J_sat = q_test / ((pr - pb) + (pb / 1.8) * (1.8 * (1 - x) - 0.8 * ef * (1 - x) ** 2))
+        J = np.where(pwf_test >= pb, J_sub, J_sat)
+        J = np.where((ef != 1) & ~np.isnan(ef2), (J / ef) * ef2, J)
+    return J
+
+
+# Q(bpd) @ Pb (vectorized)
+def Qb_vec(q_test, pwf_test, pr, pb, ef=1, ef2=None):
+    qb = j_vec(q_test, pwf_test, pr, pb, ef, ef2) * (np.asarray(pr, dtype=float) - pb)
+    return qb
+
+
+#factores de Standing que multiplican la parte de Vogel del AOF para cada combinacion de ef y ef2,
+#las combinaciones que no estan en aof() quedan como NaN (aof_vec las rechaza como aof)
+def _aof_factors(ef, ef2):
+    no_ef2 = np.isnan(ef2)
+    conditions = [
+        (ef == 1) & no_ef2,  # Darcy & Vogel
+        (ef < 1) & no_ef2,  # Darcy & Standing
+        (ef > 1) & no_ef2,  # Darcy & Standing
+        (ef < 1) & (ef2 >= 1),  # Darcy & Standing (stimulation)
+        (ef > 1) & (ef2 <= 1),  # Darcy & Standing (Higher skin)
+    ]
+    factor_sub = np.select(conditions, [1.0, 1.8 - 0.8 * ef, 0.624 + 0.376 * ef,
+                                        0.624 + 0.376 * ef2, 1.8 - 0.8 * ef2], default=np.nan)
+    factor_sat = np.select(conditions, [1.0, 1.8 * ef - 0.8 * ef ** 2, 0.624 + 0.376 * ef,
+                                        0.624 + 0.376 * ef2, 1.8 - 0.8 * ef2 ** 2], default=np.nan)
+    return factor_sub, factor_sat
+
+
+# AOF(bpd) (vectorized)
+def aof_vec(q_test, pwf_test, pr, pb, ef=1, ef2=None):
+    q_test, pwf_test, pr, pb, ef = _as_float(q_test, pwf_test, pr, pb, ef)
+    ef2 = _ef2_vec(ef2)
+    factor_sub, factor_sat = _aof_factors(ef, ef2)
+    if np.any(np.isnan(factor_sub) & ~np.isnan(ef)):
+        raise ValueError("Invalid combination of ef and ef2 values")
+    J = j_vec(q_test, pwf_test, pr, pb, ef, ef2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y = pwf_test / pr
+        aof_sub = np.where(pwf_test >= pb, J * pr, J * (pr - pb) + (J * pb / 1.8) * factor_sub)
+        aof_sat = (q_test / (1.8 * ef * (1 - y) - 0.8 * ef ** 2 * (1 - y) ** 2)) * factor_sat
+        AOF = np.where(pr > pb, aof_sub, aof_sat)
+    AOF = np.where(np.isnan(factor_sub), np.nan, AOF)
+    return AOF
+
+
+# Qo (bpd) @ Darcy Conditions (vectorized)
+def qo_darcy_vec(q_test, pwf_test, pr, pwf, pb, ef=1, ef2=None):
+    qo = j_vec(q_test, pwf_test, pr, pb) * (np.asarray(pr, dtype=float) - pwf)
+    return qo
+
+
+# Qo(bpd) @ vogel conditions (vectorized)
+def qo_vogel_vec(q_test, pwf_test, pr, pwf, pb, ef=1, ef2=None):
+    z = np.asarray(pwf, dtype=float) / pr
+    qo = aof_vec(q_test, pwf_test, pr, pb) * (1 - 0.2 * z - 0.8 * z ** 2)
+    return qo
+
+
+# Qo(bpd) @ IPR compuesto (vectorized)
+def qo_ipr_compuesto_vec(q_test, pwf_test, pr, pwf, pb):
+    pwf, pr, pb = _as_float(pwf, pr, pb)
+    J = j_vec(q_test, pwf_test, pr, pb)
+    w = pwf / pb
+    qo_sub = np.where(pwf >= pb, J * (pr - pwf),
+                      J * (pr - pb) + ((J * pb) / 1.8) * (1 - 0.2 * w - 0.8 * w ** 2))
+    qo = np.where(pr > pb, qo_sub, qo_vogel_vec(q_test, pwf_test, pr, pwf, pb))
+    return qo
+
+
+# Qo(bpd) @Standing Conditions (vectorized)
+def qo_standing_vec(q_test, pwf_test, pr, pwf, pb, ef=1, ef2=None):
+    ef = np.asarray(ef, dtype=float)
+    u = 1 - np.asarray(pwf, dtype=float) / pr
+    qo = aof_vec(q_test, pwf_test, pr, pb, ef) * (1.8 * ef * u - 0.8 * ef ** 2 * u ** 2)
+    return qo
+
+
+#Qo(bpd) @ all conditions (vectorized)
+def Qo_vec(q_test, pwf_test, pr, pwf, pb, ef=1, ef2=None):
+    pwf, pr, pb, ef = _as_float(pwf, pr, pb, ef)
+    ef2 = _ef2_vec(ef2)
+    if np.any((ef == 1) & ~np.isnan(ef2)):
+        raise ValueError("Invalid combination of ef and ef2 values")
+
+    # Yacimiento subsaturado, por encima de Pb siempre es Darcy con el J de ef = 1
+    qo_darcy = qo_darcy_vec(q_test, pwf_test, pr, pwf, pb)
+    # Debajo de Pb: Qb + cola de Vogel (ef = 1) o de Standing (ef != 1, con o sin ef2)
+    J = j_vec(q_test, pwf_test, pr, pb, ef, ef2)
+    w = 1 - pwf / pb
+    qo_tail = J * (pr - pb) + ((J * pb) / 1.8) * (1.8 * w - 0.8 * ef * w ** 2)
+    qo_sub = np.where(pwf >= pb, qo_darcy, qo_tail)
+    # Yacimiento saturado, Standing con ef = 1 es la misma curva de Vogel
+    qo_sat = qo_standing_vec(q_test, pwf_test, pr, pwf, pb, ef)
+
+    qo = np.where(pr > pb, qo_sub, qo_sat)
+    return qo
+
+
+#evaluacion de muchos pozos a la vez, una fila por prueba de pozo y una malla de presiones comun,
+#el resultado es una matriz pozos x presiones calculada con broadcasting, sin ciclos sobre los pozos
+WELL_TEST_FIELDS = ('q_test', 'pwf_test', 'pr', 'pb', 'ef', 'ef2')
+
+
+def well_test_arrays(wells):
+    # acepta un DataFrame o un arreglo estructurado, ef y ef2 son opcionales (1 y None por defecto)
+    names = wells.dtype.names if isinstance(wells, np.ndarray) else wells.columns
+    missing = [name for name in WELL_TEST_FIELDS[:4] if name not in names]
+    if missing:
+        raise ValueError(f"Missing well test fields: {', '.join(missing)}")
+    n_wells = len(wells)
+    defaults = {'ef': 1.0, 'ef2': np.nan}
+    arrays = []
+    for name in WELL_TEST_FIELDS:
+        if name in names:
+            values = np.asarray(wells[name], dtype=float)
+        else:
+            values = np.full(n_wells, defaults[name])
+        arrays.append(values)
+    return tuple(arrays)
+
+
+# Qo(bpd) for a table of wells, rows = wells, columns = pwf
+def Qo_batch(wells, pwf, method=None):
+    q_test, pwf_test, pr, pb, ef, ef2 = (values[:, np.newaxis] for values in well_test_arrays(wells))
+    pwf = np.asarray(pwf, dtype=float)
+    if pwf.ndim == 1:  # la misma malla de presiones para todos los pozos
+        pwf = pwf[np.newaxis, :]
 
     if method == 'Darcy':
-        df['Qo(bpd)'] = df['Pwf(psia)'].apply(
-            lambda x: qo_darcy(q_test, pwf_test, pr, x, pb))
+        qo = qo_darcy_vec(q_test, pwf_test, pr, pwf, pb)
     elif method == 'Vogel':
-        df['Qo(bpd)'] = df['Pwf(psia)'].apply(
-            lambda x: qo_vogel(q_test, pwf_test, pr, x, pb))
+        qo = qo_vogel_vec(q_test, pwf_test, pr, pwf, pb)
     elif method == 'IPR_compuesto':
-        df['Qo(bpd)'] = df['Pwf(psia)'].apply(
-            lambda x: qo_ipr_compuesto(q_test, pwf_test, pr, x, pb))
-    elif method == "Standing":
-        df['Qo(bpd)'] = df['Pwf(psia)'].apply(
-            lambda x: qo_standing(q_test, pwf_test, pr, x, pb, ef, ef2))
+        qo = qo_ipr_compuesto_vec(q_test, pwf_test, pr, pwf, pb)
+    elif method == 'Standing':
+        qo = qo_standing_vec(q_test, pwf_test, pr, pwf, pb, ef, ef2)
+    else:
+        qo = Qo_vec(q_test, pwf_test, pr, pwf, pb, ef, ef2)
+
+    return qo
 
+
+#modelo IPR de una prueba de pozo: J, Qb, AOF y el regimen se calculan una sola vez al crearlo y
+#rate(pwf)/pwf(rate) solo reutilizan esas constantes. Acepta escalares o arreglos (un valor por pozo)
+class IPRModel:
+    __slots__ = ('q_test', 'pwf_test', 'pr', 'pb', 'ef', 'ef2', 'J', 'Qb', 'AOF', 'subsaturated',
+                 '_j_darcy', '_aof_standing')
+
+    def __init__(self, q_test, pwf_test, pr, pb, ef=1, ef2=None):
+        self.q_test, self.pwf_test, self.pr, self.pb, self.ef = _as_float(q_test, pwf_test, pr, pb, ef)
+        self.ef2 = _ef2_vec(ef2)
+        if np.any((self.ef == 1) & ~np.isnan(self.ef2)):
+            raise ValueError("Invalid combination of ef and ef2 values")
+
+        self.subsaturated = self.pr > self.pb
+        self.J = j_vec(q_test, pwf_test, pr, pb, ef, ef2)
+        self.Qb = self.J * (self.pr - self.pb)
+        self.AOF = aof_vec(q_test, pwf_test, pr, pb, ef, ef2)
+        # Qo usa el J sin ef por encima de Pb y el AOF sin ef2 en yacimientos saturados
+        self._j_darcy = j_vec(q_test, pwf_test, pr, pb)
+        self._aof_standing = aof_vec(q_test, pwf_test, pr, pb, ef)
+
+    @classmethod
+    def from_wells(cls, wells):
+        return cls(*well_test_arrays(wells))
+
+    # Qo(bpd) @ pwf, same curve as Qo()
+    def rate(self, pwf):
+        pwf = np.asarray(pwf, dtype=float)
+        pr, pb, ef, J = self.pr, self.pb, self.ef, self.J
+        w = 1 - pwf / pb
+        qo_sub = np.where(pwf >= pb, self._j_darcy * (pr - pwf),
+                          self.Qb + ((J * pb) / 1.8) * (1.8 * w - 0.8 * ef * w ** 2))
+        u = 1 - pwf / pr
+        qo_sat = self._aof_standing * (1.8 * ef * u - 0.8 * ef ** 2 * u ** 2)
+        return np.where(self.subsaturated, qo_sub, qo_sat)
+
+    # Pwf(psia) @ Qo, inversa cerrada de rate(), NaN si el caudal no se alcanza con pwf >= 0
+    def pwf(self, rate):
+        return _pwf_from_rate(rate, self.pr, self.pb, self.ef, self.J, self.Qb, self._j_darcy, self._aof_standing)
+
+
+#inversa cerrada de la IPR (caudal -> Pwf), la comparten IPRModel.pwf y pwf_Qo_vec: Darcy por encima de Pb
+#y la raiz de la cuadratica de la cola de Vogel/Standing por debajo, sin iteraciones
+def _pwf_from_rate(rate, pr, pb, ef, J, qb, j_darcy, aof_standing):
+    rate = np.asarray(rate, dtype=float)
+
+    # raiz de 0.8 ef x^2 - 1.8 x + v = 0, los redondeos en el AOF (discriminante ~ -1e-16) dan x exacto
+    def tail(v):
+        disc = 3.24 - 3.2 * ef * v
+        disc = np.where(disc > -1e-9, np.maximum(disc, 0), np.nan)
+        return (1.8 - np.sqrt(disc)) / (1.6 * ef)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Subsaturado: Darcy hasta Pb, luego la cola de Vogel/Standing desde Qb
+        pwf_darcy = pr - rate / j_darcy
+        w = tail(np.maximum(rate - qb, 0) * 1.8 / (J * pb))
+        pwf_sub = np.where(rate <= j_darcy * (pr - pb), pwf_darcy, pb * (1 - w))
+        # Saturado: Vogel (ef = 1) o Standing
+        u = tail(rate / (ef * aof_standing))
+        pwf_sat = pr * (1 - u)
+        pwf = np.where(pr > pb, pwf_sub, pwf_sat)
+    # en el AOF el redondeo puede dejar pwf ~ -1e-13
+    return np.where(pwf > -1e-6, np.maximum(pwf, 0), np.nan)
+
+
+#Pwf(psia) @ Qo for all conditions (vectorized), inversa de Qo_vec: mismos regimenes y combinaciones de
+#ef/ef2, NaN para caudales por encima del maximo de la curva. Donde Qo_vec no es invertible (salto en Pb
+#con ef != 1, Standing con ef > 1 pasando el maximo) se devuelve la rama de mayor Pwf
+def pwf_Qo_vec(q_test, pwf_test, pr, rate, pb, ef=1, ef2=None):
+    pr, pb, ef = _as_float(pr, pb, ef)
+    ef2 = _ef2_vec(ef2)
+    if np.any((ef == 1) & ~np.isnan(ef2)):
+        raise ValueError("Invalid combination of ef and ef2 values")
+    J = j_vec(q_test, pwf_test, pr, pb, ef, ef2)
+    return _pwf_from_rate(rate, pr, pb, ef, J, J * (pr - pb), j_vec(q_test, pwf_test, pr, pb),
+                          aof_vec(q_test, pwf_test, pr, pb, ef))
+
+
+#curva IPR solo con numeros: presiones, caudales, Pb, Qb, AOF y el metodo usado. Graficarla es opcional
+#(plot_ipr con matplotlib o plot_ipr_plotly) y la curva densa sale de evaluar la IPR analitica en cada
+#punto, no de suavizar 10 puntos con un spline
+IPR_METHODS = {
+    'Darcy': qo_darcy_vec,
+    'Vogel': qo_vogel_vec,
+    'IPR_compuesto': qo_ipr_compuesto_vec,
+    'Standing': qo_standing_vec,
+}
+
+
+# rate_name es el nombre del caudal en tablas y graficos (las curvas de gas usan 'Qg(Mscf/d)')
+class IPRCurve:
+    __slots__ = ('pwf', 'qo', 'pb', 'qb', 'aof', 'method', 'rate_name')
+
+    def __init__(self, pwf, qo, pb, qb, aof, method, rate_name='Qo(bpd)'):
+        self.pwf = pwf
+        self.qo = qo
+        self.pb = pb
+        self.qb = qb
+        self.aof = aof
+        self.method = method
+        self.rate_name = rate_name
+
+    # Darcy y Vogel no marcan el punto de burbuja en el grafico, las curvas sin Pb (gas) tampoco
+    @property
+    def shows_bubble_point(self):
+        return self.pb is not None and self.method not in ('Darcy', 'Vogel')
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame({'Pwf(psia)': self.pwf, self.rate_name: self.qo})
+
+
+# IPR Curve (compute only), pwf por defecto: `points` presiones entre Pr y 0
+def ipr_curve(q_test, pwf_test, pr, pb, ef=1, ef2=None, method=None, pwf=None, points=500):
+    if pwf is None:
+        pwf = np.linspace(pr, 0, points)
+    pwf = np.asarray(pwf, dtype=float)
+
+    if method == 'Standing':
+        qo_method = lambda p: qo_standing_vec(q_test, pwf_test, pr, p, pb, ef, ef2)
+    elif method in IPR_METHODS:
+        qo_method = lambda p: IPR_METHODS[method](q_test, pwf_test, pr, p, pb)
     else:
-        df['Qo(bpd)'] = df['Pwf(psia)'].apply(
-            lambda x: Qo(q_test, pwf_test, pr, x, pb, ef, ef2))
-
-    # Stand the axis of the IPR plot
-    x = df['Qo(bpd)']
-    y = df['Pwf(psia)']
-    # The following steps are used to smooth the curve
-    X_Y_Spline = make_interp_spline(x, y)
-    X_ = np.linspace(x.min(), x.max(), 500)
-    Y_ = X_Y_Spline(X_)
-    # Build the curve
-    ax.plot(X_, Y_, c='g')
-    ax.set_xlabel('Qo(bpd)')
+        qo_method = lambda p: Qo_vec(q_test, pwf_test, pr, p, pb, ef, ef2)
+
+    return IPRCurve(pwf, qo_method(pwf), pb, float(Qb_vec(q_test, pwf_test, pr, pb)), float(qo_method(0.0)),
+                    method or 'Qo')
+
+
+# IPR plot (matplotlib)
+def plot_ipr(curve, ax=None, title='IPR'):
+    import matplotlib.pyplot as plt
+
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(20, 10))
+    ax.plot(curve.qo, curve.pwf, c='g')
+    ax.set_xlabel(curve.rate_name)
     ax.set_ylabel('Pwf(psia)')
-    ax.set_title('IPR')
-    ax.set(xlim=(0, df['Qo(bpd)'].max() + 10), ylim=(0, df['Pwf(psia)'].max() + 100))
+    ax.set_title(title)
+    ax.set(xlim=(0, np.nanmax(curve.qo) + 10), ylim=(0, np.nanmax(curve.pwf) + 100))
 
-    if (method != "Darcy") and (method != "Vogel"):
+    if curve.shows_bubble_point:
         # Arrow and Annotations
         ax.annotate(
-            'Bubble Point', xy=(Qb(q_test, pwf_test, pr, pb), pb),
-            xytext=(Qb(q_test, pwf_test, pr, pb) + 100, pb + 100),
+            'Bubble Point', xy=(curve.qb, curve.pb),
+            xytext=(curve.qb + 100, curve.pb + 100),
             arrowprops=dict(arrowstyle='->', lw=1)
         )
         # Horizontal and Vertical lines at bubble point
-        ax.axhline(y=pb, color='r', linestyle='--')
-        ax.axvline(x=Qb(q_test, pwf_test, pr, pb), color='r', linestyle='--')
+        ax.axhline(y=curve.pb, color='r', linestyle='--')
+        ax.axvline(x=curve.qb, color='r', linestyle='--')
 
     ax.grid()
+    return ax
+
+
+# IPR plot (plotly)
+def plot_ipr_plotly(curve, title='IPR'):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=curve.qo, y=curve.pwf, name=curve.method, line=dict(color='green')))
+    if curve.shows_bubble_point:
+        fig.add_hline(y=curve.pb, line_dash='dash', line_color='red')
+        fig.add_vline(x=curve.qb, line_dash='dash', line_color='red')
+        fig.add_annotation(x=curve.qb, y=curve.pb, text='Bubble Point')
+    fig.update_layout(title=title, xaxis_title=curve.rate_name, yaxis_title='Pwf(psia)')
+    return fig
+
+
+#aqui solo es para la curvas IPR, compuestos, es decir para los 3 metodos, darcy, vogel, standing o IPR compuesto
+# IPR Curve, la curva se evalua en `points` presiones dentro del rango de pwf
+def IPR_curve_methods(q_test, pwf_test, pr, pwf: list, pb, ef=1, ef2=None, method=None, points=500):
+    import matplotlib.pyplot as plt
 
+    pwf = np.asarray(pwf, dtype=float)
+    curve = ipr_curve(q_test, pwf_test, pr, pb, ef, ef2, method, pwf=np.linspace(pwf.max(), pwf.min(), points))
+    plot_ipr(curve)
     plt.show()
+    return curve
 
 
 # IPR_curve_methods(q_test, pwf_test, pr, pwf, pb, method='Darcy')
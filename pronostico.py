@@ -0,0 +1,147 @@
+#pronostico de produccion con agotamiento: cada pozo es un tanque (balance de materiales con
+#compresibilidad total ct por encima de Pb y ct_sat por debajo), en cada paso el punto de operacion
+#IPR/VLP se calcula a la presion actual, el caudal se acumula y la presion del yacimiento baja.
+#Todos los pozos avanzan juntos como arreglos; los campos grandes se reparten por bloques de pozos en un
+#pool de procesos. La IPR es la compuesta de potencial_yac (Qo/aof): en cada paso se reconstruye a la Pr
+#actual desde un punto de prueba equivalente (_equivalent_test: Darcy en Pb por encima de Pb, un punto de
+#Vogel en Pr / 2 por debajo) calculado con el J de la prueba inicial. Ese J queda fijo o, si se da la GOR, se
+#corrige con la movilidad del petroleo 1 / (mu_o Bo) de las tablas de pvt.py
+import functools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from potencial_yac import j_vec
+from analisis_nodal import operating_point
+from pvt import fluid_lookup
+
+WELL_FIELDS = ('q_test', 'pwf_test', 'pr', 'pb', 'THP', 'API', 'wc', 'sg_h2o', 'ID', 'tvd', 'md', 'C', 'N', 'ct',
+               'ct_sat')
+FLUID_FIELDS = ('gor', 'sg_gas', 't_res')
+
+
+# Pr(psia) del tanque @ Np(stb): N ct (pi - pr) = Np hasta Pb, luego con ct_sat
+def tank_pressure(Np, pi, pb, N, ct, ct_sat):
+    np_b = N * ct * np.maximum(pi - pb, 0)
+    pr = np.where(Np <= np_b, pi - Np / (N * ct), np.minimum(pi, pb) - (Np - np_b) / (N * ct_sat))
+    return np.maximum(pr, 0)
+
+
+# Prueba equivalente con el J inicial a la presion actual: Darcy en Pb si pr > pb, si no un punto de
+# Vogel en pr / 2 (AOF = J pr / 1.8)
+def _equivalent_test(J, pr, pb):
+    subsaturated = pr > pb
+    pwf_test = np.where(subsaturated, pb, 0.5 * pr)
+    q_test = np.where(subsaturated, J * (pr - pb), 0.7 * J * pr / 1.8)
+    return q_test, pwf_test
+
+
+# Resultado: caudales, presiones y acumulada por pozo (filas) en cada reporte (columnas)
+class Forecast:
+    __slots__ = ('days', 'q', 'pr', 'Np')
+
+    def __init__(self, days, q, pr, Np):
+        self.days = days
+        self.q = q
+        self.pr = pr
+        self.Np = Np
+
+    @property
+    def field_rate(self):
+        return self.q.sum(axis=0)
+
+    @property
+    def field_cumulative(self):
+        return self.Np.sum(axis=0)
+
+    def to_frame(self):
+        import pandas as pd
+
+        wells, reports = self.q.shape
+        index = pd.MultiIndex.from_product([np.arange(wells), self.days], names=['well', 'day'])
+        return pd.DataFrame({'Qo(bpd)': self.q.ravel(), 'Pr(psia)': self.pr.ravel(), 'Np(stb)': self.Np.ravel()},
+                            index=index)
+
+
+# 1 / (mu_o Bo) de cada pozo @ pr a la temperatura del yacimiento, lookup de pvt.fluid_lookup ya resuelto
+def _oil_mobility(lookup, pr, wells):
+    _, bo, mu_o, _, _ = lookup(pr, wells['t_res'], wells['gor'])
+    return 1 / (mu_o * bo)
+
+
+def _forecast_shard(args):
+    wells, steps, dt, report_every, q_min, vlp = args
+    w = wells
+    pi = w['pr']
+    J_i = j_vec(w['q_test'], w['pwf_test'], pi, w['pb'])
+    J = J_i
+    fluid = 'gor' in w
+    if fluid:
+        # las tablas PVT de los pozos se resuelven una vez, en cada paso solo se interpola
+        lookup = fluid_lookup(w['API'], w['sg_gas'])
+        mobility_i = _oil_mobility(lookup, pi, w)
+        if vlp == 'beggs_brill':
+            from vlp_multifasico import traverse_beggs_brill
+            vlp = functools.partial(traverse_beggs_brill, gor=w['gor'], sg_gas=w['sg_gas'], t_bh=w['t_res'],
+                                    lookup=lookup)
+    pr = pi.copy()
+    Np = np.zeros_like(pi)
+    producing = np.ones(pi.shape, dtype=bool)
+    n_reports = steps // report_every
+    q_out, pr_out, np_out = (np.zeros((pi.size, n_reports)) for _ in range(3))
+
+    for step in range(steps):
+        if not producing.any():
+            # todos cerrados: la presion y la acumulada ya no cambian
+            k = step // report_every
+            pr_out[:, k:], np_out[:, k:] = pr[:, None], Np[:, None]
+            break
+        if fluid:
+            J = J_i * _oil_mobility(lookup, pr, w) / mobility_i
+        q_test, pwf_test = _equivalent_test(J, pr, w['pb'])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            q, _ = operating_point(q_test, pwf_test, pr, w['pb'], w['THP'], w['API'], w['wc'], w['sg_h2o'],
+                                   w['ID'], w['tvd'], w['md'], w['C'], vlp=vlp)
+        # el pozo se cierra (y no vuelve) cuando deja de fluir o baja del caudal de abandono
+        producing &= np.isfinite(q) & (q > q_min)
+        q = np.where(producing, q, 0.0)
+        Np += q * dt
+        pr = tank_pressure(Np, pi, w['pb'], w['N'], w['ct'], w['ct_sat'])
+        if (step + 1) % report_every == 0:
+            k = (step + 1) // report_every - 1
+            q_out[:, k], pr_out[:, k], np_out[:, k] = q, pr, Np
+    return q_out, pr_out, np_out
+
+
+# Pronostico de todos los pozos: los parametros de WELL_FIELDS son escalares o arreglos de un valor por
+# pozo, N (stb) es el petroleo original del tanque. Se guarda un reporte cada report_every pasos de dt dias.
+# Los pozos se cierran por debajo de q_min (bpd). shard_size limita los pozos por bloque y processes
+# reparte los bloques en un pool de procesos. vlp como en analisis_nodal.operating_point; con gor (scf/stb),
+# sg_gas y t_res (F) J sigue la movilidad del petroleo y la VLP 'beggs_brill' usa ese mismo fluido
+def forecast(q_test, pwf_test, pr, pb, THP, API, wc, sg_h2o, ID, tvd, md, N, ct=1.5e-5, ct_sat=1e-4, C=120,
+             days=7300, dt=1.0, report_every=30, q_min=1.0, shard_size=None, processes=None, vlp=None, gor=None,
+             sg_gas=0.65, t_res=180):
+    fields = WELL_FIELDS if gor is None else WELL_FIELDS + FLUID_FIELDS
+    values = (q_test, pwf_test, pr, pb, THP, API, wc, sg_h2o, ID, tvd, md, C, N, ct, ct_sat, gor, sg_gas, t_res)
+    values = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in values[:len(fields)]))
+    wells = {name: np.atleast_1d(value).ravel().copy() for name, value in zip(fields, values)}
+    if np.any(wells['N'] <= 0) or np.any(wells['ct'] <= 0) or np.any(wells['ct_sat'] <= 0):
+        raise ValueError("N, ct and ct_sat must be positive")
+    steps = int(round(days / dt))
+    if steps < report_every:
+        raise ValueError("The forecast is shorter than one report interval")
+    size = wells['pr'].size
+
+    if shard_size is None and processes is None:
+        q, pr_out, Np = _forecast_shard((wells, steps, dt, report_every, q_min, vlp))
+    else:
+        shard_size = shard_size or -(-size // processes)
+        tasks = [({name: value[start:start + shard_size] for name, value in wells.items()},
+                  steps, dt, report_every, q_min, vlp) for start in range(0, size, shard_size)]
+        if processes:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                results = list(executor.map(_forecast_shard, tasks))
+        else:
+            results = [_forecast_shard(task) for task in tasks]
+        q, pr_out, Np = (np.concatenate([result[i] for result in results]) for i in range(3))
+
+    report_days = dt * report_every * np.arange(1, steps // report_every + 1)
+    return Forecast(report_days, q, pr_out, Np)
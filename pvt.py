@@ -0,0 +1,240 @@
+#propiedades PVT de petroleo negro: Standing o Vasquez-Beggs (Rs, Bo), Beggs-Robinson (viscosidad del
+#petroleo), Dranchuk-Abou-Kassem (z) y Lee-Gonzalez-Eakin (viscosidad del gas). Para cada fluido (API,
+#sg_gas, correlacion) las propiedades saturadas se tabulan una sola vez en una malla uniforme temperatura x
+#presion y se consultan con interpolacion bilineal vectorizada, asi un z implicito (DAK, Newton) cuesta lo
+#mismo que uno explicito. La GOR de produccion no forma parte de la tabla: por encima del punto de burbuja
+#(forma cerrada de cada correlacion) se leen los valores de Pb
+import functools
+import numpy as np
+from analisis_nodal import sg_oil
+
+CORRELATIONS = ('standing', 'vasquez_beggs')
+
+
+# Rs(scf/stb) de Standing, limitado por la GOR de produccion (por encima de Pb todo el gas esta disuelto)
+def rs_standing(p, T, API, sg_gas, gor):
+    rs = sg_gas * ((p / 18.2 + 1.4) * 10 ** (0.0125 * API - 0.00091 * T)) ** 1.2048
+    return np.minimum(rs, gor)
+
+# Pb(psia) de Standing, la presion donde Rs = gor
+def pb_standing(T, API, sg_gas, gor):
+    return 18.2 * ((gor / sg_gas) ** (1 / 1.2048) * 10 ** (0.00091 * T - 0.0125 * API) - 1.4)
+
+# Bo(rb/stb) de Standing
+def bo_standing(rs, T, API, sg_gas):
+    return 0.9759 + 0.00012 * (rs * np.sqrt(sg_gas / sg_oil(API)) + 1.25 * T) ** 1.2
+
+
+def _vasquez_beggs_rs_coefficients(API):
+    heavy = API <= 30
+    return np.where(heavy, 0.0362, 0.0178), np.where(heavy, 1.0937, 1.1870), np.where(heavy, 25.7240, 23.9310)
+
+# Rs(scf/stb) de Vasquez-Beggs, limitado por la GOR de produccion
+def rs_vasquez_beggs(p, T, API, sg_gas, gor):
+    c1, c2, c3 = _vasquez_beggs_rs_coefficients(API)
+    return np.minimum(c1 * sg_gas * p ** c2 * np.exp(c3 * API / (T + 460)), gor)
+
+# Pb(psia) de Vasquez-Beggs
+def pb_vasquez_beggs(T, API, sg_gas, gor):
+    c1, c2, c3 = _vasquez_beggs_rs_coefficients(API)
+    return (gor / (c1 * sg_gas * np.exp(c3 * API / (T + 460)))) ** (1 / c2)
+
+# Bo(rb/stb) de Vasquez-Beggs (petroleo saturado)
+def bo_vasquez_beggs(rs, T, API, sg_gas):
+    heavy = API <= 30
+    c1 = np.where(heavy, 4.677e-4, 4.670e-4)
+    c2 = np.where(heavy, 1.751e-5, 1.100e-5)
+    c3 = np.where(heavy, -1.811e-8, 1.337e-9)
+    return 1 + c1 * rs + (T - 60) * (API / sg_gas) * (c2 + c3 * rs)
+
+# Viscosidad del petroleo vivo (cp), Beggs-Robinson
+def mu_oil(rs, T, API):
+    mu_od = 10 ** (10 ** (3.0324 - 0.02023 * API) * T ** -1.163) - 1
+    return 10.715 * (rs + 100) ** -0.515 * mu_od ** (5.44 * (rs + 150) ** -0.338)
+
+# Factor z de Papay con propiedades pseudocriticas de Sutton
+def z_papay(p, T, sg_gas):
+    ppr = p / (756.8 - 131.0 * sg_gas - 3.6 * sg_gas ** 2)
+    tpr = (T + 460) / (169.2 + 349.5 * sg_gas - 74.0 * sg_gas ** 2)
+    return 1 - 3.52 * ppr / 10 ** (0.9813 * tpr) + 0.274 * ppr ** 2 / 10 ** (0.8157 * tpr)
+
+# Factor z de Dranchuk-Abou-Kassem (Sutton), Newton sobre la densidad reducida para todos los puntos a la
+# vez. Es implicito, por eso solo se evalua al construir las tablas
+def z_dak(p, T, sg_gas, tol=1e-10, maxiter=50):
+    ppr = p / (756.8 - 131.0 * sg_gas - 3.6 * sg_gas ** 2)
+    tpr = (T + 460) / (169.2 + 349.5 * sg_gas - 74.0 * sg_gas ** 2)
+    c1 = 0.3265 - 1.0700 / tpr - 0.5339 / tpr ** 3 + 0.01569 / tpr ** 4 - 0.05165 / tpr ** 5
+    c2 = 0.5475 - 0.7361 / tpr + 0.1844 / tpr ** 2
+    c3 = 0.1056 * (-0.7361 / tpr + 0.1844 / tpr ** 2)
+    c4 = 0.6134 / tpr ** 3
+    a11 = 0.7210
+    target = 0.27 * ppr / tpr
+    rho = np.array(target, dtype=float)  # z = 1
+    for _ in range(maxiter):
+        e = np.exp(-a11 * rho ** 2)
+        f = rho + c1 * rho ** 2 + c2 * rho ** 3 - c3 * rho ** 6 + c4 * (rho ** 3 + a11 * rho ** 5) * e - target
+        df = (1 + 2 * c1 * rho + 3 * c2 * rho ** 2 - 6 * c3 * rho ** 5
+              + c4 * e * (3 * rho ** 2 + 3 * a11 * rho ** 4 - 2 * a11 ** 2 * rho ** 6))
+        step = f / df
+        rho = np.maximum(rho - step, 0.5 * rho)
+        if np.all(np.abs(step) <= tol * np.maximum(rho, 1e-12)):
+            break
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(rho > 0, target / np.where(rho > 0, rho, 1), 1.0)
+
+# Densidad del gas (lb/ft3)
+def rho_gas(p, T, sg_gas, z):
+    return 2.7 * sg_gas * p / (z * (T + 460))
+
+# Viscosidad del gas (cp), Lee-Gonzalez-Eakin, rho_gas en lb/ft3
+def mu_gas(T, sg_gas, rho_gas):
+    M = 28.97 * sg_gas
+    T = T + 460
+    K = (9.4 + 0.02 * M) * T ** 1.5 / (209 + 19 * M + T)
+    X = 3.5 + 986 / T + 0.01 * M
+    return 1e-4 * K * np.exp(X * (rho_gas / 62.428) ** (2.4 - 0.2 * X))
+
+
+_RS = {'standing': rs_standing, 'vasquez_beggs': rs_vasquez_beggs}
+_PB = {'standing': pb_standing, 'vasquez_beggs': pb_vasquez_beggs}
+_BO = {'standing': bo_standing, 'vasquez_beggs': bo_vasquez_beggs}
+
+
+# Propiedades saturadas de un fluido en la malla T (F, filas) x p (psia, columnas), ejes uniformes.
+# Fuera de la malla se usa el valor del borde
+class PVTTable:
+    __slots__ = ('p', 'T', 'rs', 'bo', 'mu_o', 'z', 'mu_g', 'fluid')
+
+    def __init__(self, p, T, rs, bo, mu_o, z, mu_g, fluid):
+        self.p = p
+        self.T = T
+        self.rs = rs
+        self.bo = bo
+        self.mu_o = mu_o
+        self.z = z
+        self.mu_g = mu_g
+        self.fluid = fluid
+
+    # nodo inferior (indice plano) y peso del superior sobre un eje uniforme, sin busqueda
+    @staticmethod
+    def _node(axis, x):
+        weight = np.clip((x - axis[0]) * (1 / (axis[1] - axis[0])), 0, axis.size - 1 - 1e-9)
+        i = weight.astype(np.intp)
+        weight -= i
+        return i, weight
+
+    # indices planos de las 4 esquinas de la celda de cada punto y sus pesos
+    def _cell(self, p, plane):
+        row, t_weight = plane
+        i, p_weight = self._node(self.p, p)
+        i += row
+        j = i + self.p.size
+        return i, i + 1, j, j + 1, p_weight, t_weight
+
+    def _plane(self, T):
+        k, weight = self._node(self.T, T)
+        return k * self.p.size, weight
+
+    # interpolacion bilineal con las esquinas de _cell
+    @staticmethod
+    def _lerp(values, cell):
+        i00, i01, i10, i11, p_weight, t_weight = cell
+        low = values.take(i00)
+        value = values.take(i01)
+        value -= low
+        value *= p_weight
+        low += value
+        high = values.take(i10)
+        value = values.take(i11)
+        value -= high
+        value *= p_weight
+        high += value
+        high -= low
+        high *= t_weight
+        low += high
+        return low
+
+    # Pb(psia) @ T para la GOR de produccion (scf/stb)
+    def bubble_point(self, T, gor):
+        API, sg_gas, correlation = self.fluid
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return _PB[correlation](T, API, sg_gas, gor)
+
+    def _oil(self, p, T, gor, plane):
+        cell = self._cell(np.minimum(p, self.bubble_point(T, gor)), plane)
+        return np.minimum(self._lerp(self.rs, cell), gor), self._lerp(self.bo, cell), self._lerp(self.mu_o, cell)
+
+    def _gas(self, p, plane):
+        cell = self._cell(p, plane)
+        return self._lerp(self.z, cell), self._lerp(self.mu_g, cell)
+
+    # Rs(scf/stb), Bo(rb/stb) y mu_o(cp) @ p, T con la GOR de produccion, con broadcasting
+    def oil(self, p, T, gor):
+        p, T, gor = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (p, T, gor)))
+        return self._oil(p, T, gor, self._plane(T))
+
+    # z y mu_g(cp) @ p, T
+    def gas(self, p, T):
+        p, T = np.broadcast_arrays(np.asarray(p, dtype=float), np.asarray(T, dtype=float))
+        return self._gas(p, self._plane(T))
+
+    # Rs, Bo, mu_o, z y mu_g @ p, T, la fila de temperatura se ubica una sola vez
+    def properties(self, p, T, gor):
+        p, T, gor = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (p, T, gor)))
+        plane = self._plane(T)
+        return self._oil(p, T, gor, plane) + self._gas(p, plane)
+
+
+@functools.lru_cache(maxsize=64)
+def _build_table(API, sg_gas, correlation, p_axis, T_axis):
+    p = np.arange(p_axis[0], p_axis[1] + 0.5 * p_axis[2], p_axis[2])
+    T = np.arange(T_axis[0], T_axis[1] + 0.5 * T_axis[2], T_axis[2])
+    p_grid, T_grid = p[None, :], T[:, None]
+    rs = _RS[correlation](p_grid, T_grid, API, sg_gas, np.inf)
+    bo = _BO[correlation](rs, T_grid, API, sg_gas)
+    z = z_dak(p_grid, T_grid, sg_gas)
+    mu_g = mu_gas(T_grid, sg_gas, rho_gas(p_grid, T_grid, sg_gas, z))
+    table = PVTTable(p, T, rs, bo, mu_oil(rs, T_grid, API), z, mu_g, (API, sg_gas, correlation))
+    for name in ('p', 'T', 'rs', 'bo', 'mu_o', 'z', 'mu_g'):
+        getattr(table, name).flags.writeable = False
+    return table
+
+
+# Tabla PVT de un fluido, se construye una vez por (API, sg_gas, correlation, malla) y queda en memoria.
+# Los arreglos de la tabla son de solo lectura porque se comparten entre llamadas
+def pvt_table(API, sg_gas=0.65, correlation='standing', p_max=15000.0, dp=20.0, t_min=40.0, t_max=400.0, dT=5.0):
+    if correlation not in CORRELATIONS:
+        raise ValueError(f"Unknown PVT correlation: {correlation}")
+    if dp <= 0 or dT <= 0 or p_max <= 14.7 + dp or t_max <= t_min + dT:
+        raise ValueError("The PVT grid needs at least two points per axis")
+    return _build_table(round(float(API), 6), round(float(sg_gas), 6), correlation,
+                        (14.7, float(p_max), float(dp)), (float(t_min), float(t_max), float(dT)))
+
+
+# Funcion (p, T, gor) -> Rs, Bo, mu_o, z, mu_g para un conjunto fijo de fluidos: las tablas se resuelven una
+# sola vez, para bucles que consultan muchas veces los mismos pozos. API y sg_gas pueden variar por elemento
+# (cada fluido distinto usa su propia tabla)
+def fluid_lookup(API, sg_gas, correlation='standing'):
+    API, sg_gas = np.broadcast_arrays(np.asarray(API, dtype=float), np.asarray(sg_gas, dtype=float))
+    if API.size and np.all(API == API.flat[0]) and np.all(sg_gas == sg_gas.flat[0]):
+        return pvt_table(API.flat[0], sg_gas.flat[0], correlation).properties
+
+    fluids, inverse = np.unique(np.stack([API.ravel(), sg_gas.ravel()], axis=1), axis=0, return_inverse=True)
+    inverse = inverse.reshape(API.shape)
+    groups = [(inverse == k, pvt_table(api, sg, correlation)) for k, (api, sg) in enumerate(fluids)]
+
+    def lookup(p, T, gor):
+        p, T, gor = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (p, T, gor, API)))[:3]
+        properties = tuple(np.empty(p.shape) for _ in range(5))
+        for mask, table in groups:
+            mask = np.broadcast_to(mask, p.shape)
+            for out, value in zip(properties, table.properties(p[mask], T[mask], gor[mask])):
+                out[mask] = value
+        return properties
+
+    return lookup
+
+
+# Rs, Bo, mu_o, z y mu_g @ p, T para arreglos con broadcasting
+def fluid_properties(p, T, API, sg_gas, gor, correlation='standing'):
+    return fluid_lookup(API, sg_gas, correlation)(p, T, gor)
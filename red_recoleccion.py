@@ -0,0 +1,169 @@
+#red de recoleccion: muchos pozos conectados por lineas de flujo a manifolds compartidos, los manifolds se
+#conectan entre si (arbol) hasta el separador a presion fija. El THP de cada pozo depende del caudal total
+#que pasa por su manifold, asi que caudales de pozos y presiones de manifolds se resuelven juntos con
+#Newton: una ecuacion IPR = VLP por pozo y una caida de presion por linea de manifold, con el jacobiano
+#disperso (scipy.sparse). solve() arranca desde la ultima solucion (warm start)
+import numpy as np
+from analisis_nodal import pwf_ipr, q_max_ipr, gradient_avg, f_darcy
+
+WELL_FIELDS = ('q_test', 'pwf_test', 'pr', 'pb', 'API', 'wc', 'sg_h2o', 'ID', 'tvd', 'md', 'C', 'manifold',
+               'fl_length', 'fl_ID', 'fl_C', 'fl_dz')
+MANIFOLD_FIELDS = ('parent', 'length', 'ID', 'C', 'dz')
+
+
+# Caida de presion (psi) en una linea @ Q: Hazen-Williams (f_darcy) + elevacion, con el gradiente del fluido
+def line_dp(Q, gradient, length, ID, C, dz):
+    return gradient * (dz + f_darcy(np.maximum(Q, 0), ID, C) * length)
+
+
+def line_dp_dq(Q, gradient, length, ID, C):
+    Q = np.maximum(Q, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(Q > 0, 1.85 * gradient * f_darcy(Q, ID, C) * length / Q, 0.0)
+
+
+def _columns(table, fields, defaults):
+    missing = [name for name in fields if name not in table and name not in defaults]
+    if missing:
+        raise ValueError(f"Missing fields: {', '.join(missing)}")
+    n = len(table[next(name for name in fields if name in table)])
+    return {name: np.broadcast_to(np.asarray(table[name] if name in table else defaults[name], dtype=float),
+                                  (n,)).copy() for name in fields}
+
+
+# Solucion de la red: caudal, Pwf y THP por pozo, presion y caudal por manifold
+class NetworkSolution:
+    __slots__ = ('q', 'pwf', 'thp', 'p_manifold', 'q_manifold', 'iterations', 'residual')
+
+    def __init__(self, q, pwf, thp, p_manifold, q_manifold, iterations, residual):
+        self.q = q
+        self.pwf = pwf
+        self.thp = thp
+        self.p_manifold = p_manifold
+        self.q_manifold = q_manifold
+        self.iterations = iterations
+        self.residual = residual
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame({'Q(bpd)': self.q, 'Pwf(psia)': self.pwf, 'THP(psia)': self.thp})
+
+
+# wells y manifolds: DataFrames o dicts de arreglos con los campos de WELL_FIELDS y MANIFOLD_FIELDS.
+# manifold es el numero de manifold de cada pozo y parent el manifold aguas abajo (-1 = separador)
+class GatheringNetwork:
+    __slots__ = ('wells', 'manifolds', 'p_sep', 'last', '_paths', '_well_gradient', '_line_gradient')
+
+    def __init__(self, wells, manifolds, p_sep):
+        self.wells = _columns(wells, WELL_FIELDS, {'C': 120, 'fl_C': 120, 'fl_dz': 0.0})
+        self.manifolds = _columns(manifolds, MANIFOLD_FIELDS, {'C': 120, 'dz': 0.0})
+        self.p_sep = float(p_sep)
+        self.last = None
+        w, m = self.wells, self.manifolds
+        n_m = len(m['parent'])
+        parent = m['parent'].astype(int)
+        manifold = w['manifold'].astype(int)
+        if np.any((manifold < 0) | (manifold >= n_m)) or np.any((parent < -1) | (parent >= n_m)):
+            raise ValueError("Manifold indices out of range")
+
+        # (manifold, pozo) para cada linea por la que pasa el caudal de cada pozo, subiendo hasta el separador
+        rows, cols = [], []
+        current, wells_idx = manifold, np.arange(manifold.size)
+        for _ in range(n_m + 1):
+            if current.size == 0:
+                break
+            rows.append(current)
+            cols.append(wells_idx)
+            keep = parent[current] >= 0
+            current, wells_idx = parent[current][keep], wells_idx[keep]
+        else:
+            raise ValueError("Manifold tree has a cycle")
+        self._paths = (np.concatenate(rows), np.concatenate(cols))
+
+        self._well_gradient = gradient_avg(w['API'], w['wc'], w['sg_h2o'])
+        # gradiente de cada linea de manifold: promedio de los pozos que pasan por ella
+        count = np.bincount(self._paths[0], minlength=n_m)
+        total = np.bincount(self._paths[0], weights=self._well_gradient[self._paths[1]], minlength=n_m)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._line_gradient = np.where(count > 0, total / count, 0.433)
+
+    def _well_residual(self, q, p_manifold):
+        w = self.wells
+        g = self._well_gradient
+        thp = p_manifold[w['manifold'].astype(int)] + line_dp(q, g, w['fl_length'], w['fl_ID'], w['fl_C'], w['fl_dz'])
+        po = thp + g * w['tvd'] + g * f_darcy(q, w['ID'], w['C']) * w['md']
+        return pwf_ipr(w['q_test'], w['pwf_test'], q, w['pr'], w['pb']) - po, thp
+
+    def _manifold_flow(self, q):
+        return np.bincount(self._paths[0], weights=q[self._paths[1]], minlength=len(self.manifolds['parent']))
+
+    def _manifold_residual(self, p_manifold, Q):
+        m = self.manifolds
+        parent = m['parent'].astype(int)
+        p_parent = np.where(parent >= 0, p_manifold[np.maximum(parent, 0)], self.p_sep)
+        return p_manifold - p_parent - line_dp(Q, self._line_gradient, m['length'], m['ID'], m['C'], m['dz'])
+
+    # q0 (bpd por pozo) y p0 (psia por manifold) opcionales, por defecto la ultima solucion o un arranque
+    # con la mitad del caudal maximo y el separador en todos los manifolds
+    def solve(self, q0=None, p0=None, tol=1e-6, maxiter=50):
+        from scipy import sparse
+        from scipy.sparse.linalg import spsolve
+
+        w, m = self.wells, self.manifolds
+        n_w, n_m = len(w['pr']), len(m['parent'])
+        q_max = q_max_ipr(w['q_test'], w['pwf_test'], w['pr'], w['pb'])
+        if q0 is None:
+            q0 = self.last.q if self.last is not None else 0.5 * q_max
+        if p0 is None:
+            p0 = self.last.p_manifold if self.last is not None else np.full(n_m, self.p_sep)
+        q = np.clip(np.array(q0, dtype=float), 0, q_max)
+        p = np.array(p0, dtype=float)
+
+        parent = m['parent'].astype(int)
+        has_parent = parent >= 0
+        well_rows = np.arange(n_w)
+        manifold_rows = n_w + np.arange(n_m)
+        well_manifold = n_w + w['manifold'].astype(int)
+        # bloque constante del jacobiano: dR_manifold/dP = 1 y -1 con el manifold padre
+        const_rows = np.concatenate([manifold_rows, manifold_rows[has_parent]])
+        const_cols = np.concatenate([manifold_rows, n_w + parent[has_parent]])
+        const_vals = np.concatenate([np.ones(n_m), -np.ones(has_parent.sum())])
+        path_m, path_w = self._paths
+
+        for iteration in range(1, maxiter + 1):
+            r_w, _ = self._well_residual(q, p)
+            Q = self._manifold_flow(q)
+            r_m = self._manifold_residual(p, Q)
+            # pozos que no fluyen con la presion actual de su manifold: ecuacion q = 0
+            shut = self._well_residual(np.zeros(n_w), p)[0] <= 0
+            r_w = np.where(shut, q, r_w)
+            residual = np.abs(np.concatenate([r_w, r_m])).max(initial=0)
+
+            # derivada de cada pozo respecto a su propio caudal (diferencias centradas, todos a la vez)
+            h = 1e-4 * np.maximum(q_max, 1)
+            hi, lo = np.minimum(q + h, q_max), np.maximum(q - h, 0)
+            dr_dq = (self._well_residual(hi, p)[0] - self._well_residual(lo, p)[0]) / (hi - lo)
+            dr_dq = np.where(shut, 1.0, dr_dq)
+            # dR_manifold/dq_pozo = -dp/dQ de cada linea por la que pasa el pozo
+            dline = line_dp_dq(Q, self._line_gradient, m['length'], m['ID'], m['C'])
+            # dr_pozo/dP_manifold = -1 (0 para los pozos cerrados)
+            rows = np.concatenate([well_rows, well_rows, const_rows, n_w + path_m])
+            cols = np.concatenate([well_rows, well_manifold, const_cols, path_w])
+            vals = np.concatenate([dr_dq, np.where(shut, 0.0, -1.0), const_vals, -dline[path_m]])
+            jacobian = sparse.csc_matrix((vals, (rows, cols)), shape=(n_w + n_m, n_w + n_m))
+
+            step = spsolve(jacobian, -np.concatenate([r_w, r_m]))
+            q_new = np.clip(q + step[:n_w], 0, q_max)
+            p_new = p + step[n_w:]
+            change = max(np.abs(q_new - q).max(initial=0), np.abs(p_new - p).max(initial=0))
+            q, p = q_new, p_new
+            if change <= tol * (1 + max(q.max(initial=0), p.max(initial=0))) or residual <= tol:
+                break
+        else:
+            raise ValueError(f"Network solve did not converge in {maxiter} iterations (residual {residual:.3g})")
+
+        r_w, thp = self._well_residual(q, p)
+        pwf = pwf_ipr(w['q_test'], w['pwf_test'], q, w['pr'], w['pb'])
+        self.last = NetworkSolution(q, pwf, thp, p, self._manifold_flow(q), iteration, residual)
+        return self.last
@@ -0,0 +1,96 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from analisis_nodal import operating_point
+
+#barrido de sensibilidades del analisis nodal: cada parametro de SWEEP_PARAMS puede ser un valor fijo o
+#un rango, los rangos se vuelven dimensiones y se evalua la malla cartesiana completa con broadcasting
+SWEEP_PARAMS = ('THP', 'wc', 'ID', 'C', 'pr')
+
+
+# Resultado etiquetado: Q y Pwf de operacion con una dimension por parametro barrido
+class NodalSweep:
+    __slots__ = ('dims', 'coords', 'q', 'pwf')
+
+    def __init__(self, dims, coords, q, pwf):
+        self.dims = dims
+        self.coords = coords
+        self.q = q
+        self.pwf = pwf
+
+    @property
+    def shape(self):
+        return self.q.shape
+
+    # seleccion por valor, ej: sweep.sel(THP=360, wc=0.5)
+    def sel(self, **values):
+        index = []
+        for dim in self.dims:
+            if dim in values:
+                matches = np.flatnonzero(np.isclose(self.coords[dim], values.pop(dim)))
+                if matches.size == 0:
+                    raise KeyError(f"Value not found in {dim} coordinates")
+                index.append(matches[0])
+            else:
+                index.append(slice(None))
+        if values:
+            raise KeyError(f"Unknown dimensions: {', '.join(values)}")
+        index = tuple(index)
+        dims = tuple(dim for dim, i in zip(self.dims, index) if isinstance(i, slice))
+        coords = {dim: self.coords[dim] for dim in dims}
+        return NodalSweep(dims, coords, self.q[index], self.pwf[index])
+
+    def to_frame(self):
+        import pandas as pd
+
+        index = pd.MultiIndex.from_product([self.coords[dim] for dim in self.dims], names=self.dims)
+        return pd.DataFrame({'Q(bpd)': self.q.ravel(), 'Pwf(psia)': self.pwf.ravel()}, index=index)
+
+
+def _operating_point(params):
+    return operating_point(params['q_test'], params['pwf_test'], params['pr'], params['pb'], params['THP'],
+                           params['API'], params['wc'], params['sg_h2o'], params['ID'], params['tvd'],
+                           params['md'], params['C'])
+
+
+def _sweep_chunk(args):
+    fixed, grid, shape, start, stop = args
+    flat = np.unravel_index(np.arange(start, stop), shape)
+    params = dict(fixed)
+    for (name, values), index in zip(grid.items(), flat):
+        params[name] = values[index]
+    return _operating_point(params)
+
+
+# Barrido nodal: THP, wc, ID, C y pr aceptan escalares o arreglos 1-D.
+# chunk_size limita la memoria por bloque y processes reparte los bloques en un pool de procesos
+def nodal_sweep(q_test, pwf_test, pr, pb, THP, API, wc, sg_h2o, ID, tvd, md, C=120,
+                chunk_size=None, processes=None):
+    inputs = {'THP': THP, 'wc': wc, 'ID': ID, 'C': C, 'pr': pr}
+    grid = {name: np.asarray(value, dtype=float) for name, value in inputs.items() if np.ndim(value) > 0}
+    fixed = {name: float(value) for name, value in inputs.items() if np.ndim(value) == 0}
+    fixed.update(q_test=q_test, pwf_test=pwf_test, pb=pb, API=API, sg_h2o=sg_h2o, tvd=tvd, md=md)
+    dims = tuple(grid)
+    shape = tuple(values.size for values in grid.values())
+    size = int(np.prod(shape))
+
+    if chunk_size is None and processes is None:
+        # toda la malla de una vez, cada parametro con su propio eje
+        params = dict(fixed)
+        for axis, (name, values) in enumerate(grid.items()):
+            params[name] = values.reshape([-1 if i == axis else 1 for i in range(len(shape))])
+        q, pwf = _operating_point(params)
+        q = np.broadcast_to(q, shape).copy()
+        pwf = np.broadcast_to(pwf, shape).copy()
+    else:
+        chunk_size = chunk_size or -(-size // processes)
+        tasks = [(fixed, grid, shape, start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+        if processes:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                results = list(executor.map(_sweep_chunk, tasks))
+        else:
+            results = [_sweep_chunk(task) for task in tasks]
+        q = np.concatenate([result[0] for result in results]).reshape(shape)
+        pwf = np.concatenate([result[1] for result in results]).reshape(shape)
+
+    coords = {name: values for name, values in grid.items()}
+    return NodalSweep(dims, coords, q, pwf)
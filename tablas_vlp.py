@@ -0,0 +1,69 @@
+#tablas de levantamiento tipo VFP: la presion de fondo de la VLP de analisis_nodal se calcula una sola vez
+#por tuberia/completacion sobre una malla caudal x THP x wc x ID, se guarda en binario (.npy que se puede
+#abrir con memory map y compartir entre procesos, mas un .json con los ejes) y se consulta con
+#interpolacion multilineal vectorizada
+import json
+import numpy as np
+from analisis_nodal import po_vlp
+
+LIFT_AXES = ('q', 'THP', 'wc', 'ID')
+
+
+class LiftTable:
+    __slots__ = ('axes', 'bhp', 'meta')
+
+    def __init__(self, axes, bhp, meta):
+        self.axes = axes
+        self.bhp = bhp
+        self.meta = meta
+
+    # BHP(psia) @ (q, THP, wc, ID), los argumentos se combinan con broadcasting. Fuera de la malla se
+    # usa el valor del borde
+    def __call__(self, q, THP, wc, ID):
+        points = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (q, THP, wc, ID)))
+        lower, upper, weight = [], [], []
+        for axis, x in zip(self.axes.values(), points):
+            i = np.clip(np.searchsorted(axis, x, side='right') - 1, 0, max(axis.size - 2, 0))
+            j = np.minimum(i + 1, axis.size - 1)
+            span = axis[j] - axis[i]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t = np.where(span > 0, (x - axis[i]) / span, 0.0)
+            lower.append(i)
+            upper.append(j)
+            weight.append(np.clip(t, 0.0, 1.0))
+
+        flat = np.asarray(self.bhp).reshape(-1)
+        strides = np.cumprod((1,) + self.bhp.shape[:0:-1])[::-1]
+        # indices planos de las 2^4 esquinas de la celda, luego interpolacion lineal eje por eje
+        corners = [sum(i * stride for i, stride in zip(lower, strides))]
+        for i, j, stride in zip(lower, upper, strides):
+            step = (j - i) * stride
+            corners = [index for base in corners for index in (base, base + step)]
+        values = [flat[index] for index in corners]
+        for t in reversed(weight):
+            values = [a + t * (b - a) for a, b in zip(values[0::2], values[1::2])]
+        return values[0]
+
+    def save(self, path):
+        np.save(f'{path}.npy', np.ascontiguousarray(self.bhp))
+        with open(f'{path}.json', 'w') as f:
+            json.dump({'axes': {name: axis.tolist() for name, axis in self.axes.items()}, 'meta': self.meta}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(f'{path}.json') as f:
+            header = json.load(f)
+        axes = {name: np.asarray(axis, dtype=float) for name, axis in header['axes'].items()}
+        bhp = np.load(f'{path}.npy', mmap_mode='r' if mmap else None)
+        return cls(axes, bhp, header['meta'])
+
+
+# Tabla de BHP para una tuberia/completacion (API, sg_h2o, tvd, md, C fijos)
+def build_lift_table(q, THP, wc, ID, API, sg_h2o, tvd, md, C=120, dtype=np.float32):
+    axes = {name: np.unique(np.asarray(values, dtype=float)) for name, values in zip(LIFT_AXES, (q, THP, wc, ID))}
+    grids = [axis.reshape([-1 if i == k else 1 for i in range(len(axes))]) for k, axis in enumerate(axes.values())]
+    q_grid, thp_grid, wc_grid, id_grid = grids
+    bhp = po_vlp(q_grid, thp_grid, API, wc_grid, sg_h2o, id_grid, tvd, md, C)
+    bhp = np.broadcast_to(bhp, tuple(axis.size for axis in axes.values())).astype(dtype)
+    meta = {'API': API, 'sg_h2o': sg_h2o, 'tvd': tvd, 'md': md, 'C': C}
+    return LiftTable(axes, bhp, meta)
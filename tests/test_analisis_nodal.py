@@ -0,0 +1,26 @@
+#VLP de la tabla nodal y del punto de operacion
+import numpy as np
+import pytest
+from analisis_nodal import nodal_table, operating_point
+from vlp_multifasico import traverse_beggs_brill
+
+WELL = (1500, 2400, 3000, 2300, 200, 35, 0.3, 1.07, 2.992, 6000, 6000)
+
+
+def test_beggs_brill_needs_the_fluid():
+    with pytest.raises(ValueError):
+        nodal_table(*WELL, vlp='beggs_brill')
+    with pytest.raises(ValueError):
+        operating_point(*WELL, vlp='beggs_brill', fluid={'gor': 400})
+
+
+def test_beggs_brill_uses_the_given_fluid():
+    fluid = {'gor': 1200, 'sg_gas': 0.75, 't_bh': 200}
+    q = np.array([500.0, 1500.0])
+    df = nodal_table(*WELL, q=q, vlp='beggs_brill', fluid=fluid)
+    np.testing.assert_allclose(df['Po(psia)'], traverse_beggs_brill(q, *WELL[4:], **fluid)[0])
+    low_gor = nodal_table(*WELL, q=q, vlp='beggs_brill', fluid=dict(fluid, gor=200))
+    assert np.all(df['Po(psia)'] < low_gor['Po(psia)'])
+
+    q_op, pwf_op = operating_point(*WELL, vlp='beggs_brill', fluid=fluid)
+    assert pwf_op == pytest.approx(traverse_beggs_brill(q_op, *WELL[4:], **fluid)[0], abs=1e-3)
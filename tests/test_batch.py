@@ -0,0 +1,62 @@
+#corrida por lotes: un solo esquema de salida aunque el primer bloque traiga columnas vacias
+import numpy as np
+import pandas as pd
+import pytest
+from batch import run
+
+N_WELLS = 12
+
+
+def _wells():
+    rng = np.random.default_rng(3)
+    pr = rng.uniform(2500, 4000, N_WELLS)
+    wells = pd.DataFrame({
+        'well': [f'W-{i}' for i in range(N_WELLS)],
+        'Qt': rng.integers(300, 1500, N_WELLS),
+        'Pwft': np.round(pr * 0.6),
+        'Pr': pr,
+        'Pb': 2000,
+        'THP': 150, 'API': 35, 'wc': 0.2, 'sg_h2o': 1.07, 'ID': 2.992, 'tvd': 6000, 'md': 6000,
+    })
+    # el primer bloque (4 filas) no trae ef2, C ni notas; los siguientes si, enteros y con decimales
+    wells['ef2'] = [None] * 4 + [1.2, 0.8] * 4
+    wells['C'] = pd.array([None] * 4 + [120, 100] * 4, dtype='Int64')
+    wells['ef'] = [1.0] * 4 + [0.8, 1.3] * 4
+    wells['note'] = [None] * 4 + ['ok'] * 8
+    return wells
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.parquet'])
+def test_null_first_chunk_keeps_one_schema(tmp_path, suffix):
+    wells = _wells()
+    source = str(tmp_path / f'wells{suffix}')
+    if suffix == '.csv':
+        wells.to_csv(source, index=False)
+    else:
+        # cada columna con su tipo, las nulas del primer bloque como nulos de pyarrow
+        wells.to_parquet(source, index=False)
+    output, curves = str(tmp_path / 'results.parquet'), str(tmp_path / 'curves.parquet')
+    run(source, output, curves, curve_points=5, chunk_size=4, workers=1)
+
+    results = pd.read_parquet(output)
+    assert len(results) == N_WELLS
+    for column in ('ef2', 'C', 'ef', 'pr', 'q_test', 'J', 'Q_op(bpd)'):
+        assert results[column].dtype == np.float64
+    assert results['row'].tolist() == list(range(N_WELLS))
+    assert results['note'].isna().sum() == 4 and (results['note'][4:] == 'ok').all()
+    np.testing.assert_array_equal(results['C'][4:], [120, 100] * 4)
+    curve_table = pd.read_parquet(curves)
+    assert len(curve_table) == 5 * N_WELLS
+    assert curve_table.columns.tolist() == ['well', 'row', 'Pwf(psia)', 'Qo(bpd)']
+
+
+def test_all_null_parquet_column(tmp_path):
+    # una columna sin ningun valor en todo el archivo (tipo null de pyarrow) se escribe como float64
+    wells = _wells()
+    wells['ef2'] = None
+    source = str(tmp_path / 'wells.parquet')
+    wells.to_parquet(source, index=False)
+    output = str(tmp_path / 'results.csv')
+    run(source, output, chunk_size=5, workers=1)
+    results = pd.read_csv(output)
+    assert len(results) == N_WELLS and results['ef2'].isna().all()
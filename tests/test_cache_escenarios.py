@@ -0,0 +1,47 @@
+#cache de escenarios: lo que devuelve a una sesion no puede cambiar lo que reciben las demas
+import numpy as np
+import pandas as pd
+import pytest
+from cache_escenarios import ScenarioCache
+from potencial_yac import IPRModel, ipr_curve
+from incertidumbre import monte_carlo
+
+PARAMS = dict(q_test=500.0, pwf_test=3000.0, pr=4000.0, pb=2500.0)
+
+
+def test_arrays_are_read_only():
+    cache = ScenarioCache()
+    pwf = np.linspace(4000, 0, 11)
+    curve = cache.get_or_compute('ipr_curve', PARAMS, lambda: ipr_curve(**PARAMS, pwf=pwf))
+    with pytest.raises(ValueError):
+        curve.qo[0] = -1
+    # el arreglo de la llamada no queda congelado
+    pwf[0] = 4000
+    again = cache.get_or_compute('ipr_curve', PARAMS, lambda: None)
+    assert again is curve and cache.hits == 1
+
+
+def test_objects_and_nested_results_are_frozen():
+    cache = ScenarioCache()
+    model = cache.get_or_compute('ipr_model', PARAMS, lambda: IPRModel(**PARAMS))
+    with pytest.raises(ValueError):
+        model.pr[...] = 0
+    spec = dict(PARAMS, pr=('normal', 4000, 100))
+    result = cache.get_or_compute('monte_carlo', spec, lambda: monte_carlo(spec, n=100, outputs=('AOF',), seed=0))
+    with pytest.raises(ValueError):
+        result.outputs['AOF'][:] = 0
+    with pytest.raises(ValueError):
+        result.inputs['pr'][0] = 0
+
+
+def test_frames_are_copied_on_each_read():
+    cache = ScenarioCache()
+    params = dict(PARAMS, metodo='Vogel')
+    first = cache.get_or_compute('table', params, lambda: pd.DataFrame({'q': [1.0, 2.0]}))
+    first.loc[0, 'q'] = -1
+    first['extra'] = 0
+    second = cache.get_or_compute('table', params, lambda: None)
+    assert second['q'].tolist() == [1.0, 2.0] and list(second.columns) == ['q']
+    frame, _ = cache.get_or_compute('pair', params, lambda: (pd.DataFrame({'q': [3.0]}), 1.0))
+    frame.iloc[0, 0] = 0
+    assert cache.get_or_compute('pair', params, lambda: None)[0].iloc[0, 0] == 3.0
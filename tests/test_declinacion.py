@@ -0,0 +1,38 @@
+#ajuste de Arps de todos los pozos a la vez sobre curvas sinteticas
+import numpy as np
+import pandas as pd
+import pytest
+from declinacion import arps_rate, fit_arps
+from volve import ProductionIndex
+
+WELLS = [(1000.0, 0.01, 0.0), (800.0, 0.02, 0.5), (1500.0, 0.005, 1.0)]
+
+
+def test_fit_recovers_synthetic_parameters():
+    t = np.arange(0, 365, 5.0)
+    well = np.repeat(np.arange(len(WELLS)), t.size)
+    q = np.concatenate([arps_rate(t, qi, Di, b) for qi, Di, b in WELLS])
+    fit = fit_arps(np.tile(t, len(WELLS)), q, well, len(WELLS))
+    for i, (qi, Di, b) in enumerate(WELLS):
+        assert fit['b'][i] == b
+        assert fit['qi'][i] == pytest.approx(qi, rel=1e-6)
+        assert fit['Di'][i] == pytest.approx(Di, rel=1e-6)
+        assert fit['r2'][i] == pytest.approx(1.0)
+
+
+def test_decline_of_production_index():
+    dates = pd.date_range('2010-01-01', periods=200)
+    t = np.arange(200.0)
+    frames = [pd.DataFrame({'WELL_BORE_CODE': 'A', 'DATEPRD': dates, 'BORE_WAT_VOL': 0.0,
+                            'BORE_OIL_VOL': np.r_[np.linspace(100, 900, 10), arps_rate(t[:190], 1000, 0.01, 0.5)]}),
+              pd.DataFrame({'WELL_BORE_CODE': 'B', 'DATEPRD': dates, 'BORE_WAT_VOL': 0.0, 'BORE_OIL_VOL': np.nan})]
+    decline = ProductionIndex(pd.concat(frames, ignore_index=True)).decline()
+
+    # el ajuste empieza en el pico (dia 10), t0 es esa fecha
+    assert decline.loc['A', 't0'] == dates[10]
+    assert decline.loc['A', 'b'] == 0.5
+    assert decline.loc['A', 'qi'] == pytest.approx(1000, rel=1e-6)
+    # un pozo sin caudales validos no tiene ajuste ni fecha de inicio
+    assert pd.isna(decline.loc['B', 't0'])
+    assert np.isnan(decline.loc['B', ['qi', 'Di', 'b']].astype(float)).all()
+    assert decline.loc['B', 'points'] == 0
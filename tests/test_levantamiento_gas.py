@@ -0,0 +1,78 @@
+#reparto de gas de levantamiento contra la busqueda exhaustiva en campos chicos
+import itertools
+import numpy as np
+import pytest
+from levantamiento_gas import GasLiftAllocator, concave_envelope
+
+
+def _brute_force(rates, units, min_level, max_level):
+    best = -np.inf
+    for levels in itertools.product(*(range(lo, hi + 1) for lo, hi in zip(min_level, max_level))):
+        if sum(levels) <= units:
+            best = max(best, sum(rates[well, level] for well, level in enumerate(levels)))
+    return best
+
+
+# curvas con gas de arranque: cero hasta kickoff y luego crecientes con rendimiento decreciente
+def _threshold_curves(rng, n, k):
+    kickoff = rng.integers(0, k, size=n)
+    gas = np.arange(k)
+    rates = np.where(gas >= kickoff[:, None], rng.uniform(100, 500, (n, 1)) * np.sqrt(gas + 1), 0.0)
+    rates[:, 0] = 0.0
+    return rates
+
+
+def test_threshold_curve_gets_all_the_gas():
+    rates = [[0, 0, 0, 10], [0, 4, 5, 5.5]]
+    allocator = GasLiftAllocator(rates, 1.0, 3.0)
+    assert allocator.levels.tolist() == [3, 0]
+    assert allocator.total_rate() == 10
+
+
+def test_concave_curves_stay_on_the_greedy_allocation():
+    rates = np.sqrt(np.arange(6.0))[None, :] * np.array([[100], [200], [150]])
+    allocator = GasLiftAllocator(rates, 1.0, 7.0)
+    np.testing.assert_array_equal(concave_envelope(rates), rates)
+    assert allocator.total_rate() == pytest.approx(_brute_force(rates, 7, [0] * 3, [5] * 3))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_allocation_is_optimal_on_non_concave_curves(seed):
+    rng = np.random.default_rng(seed)
+    n, k = 4, 6
+    rates = _threshold_curves(rng, n, k)
+    min_level = rng.integers(0, 2, size=n)
+    max_level = np.maximum(min_level, rng.integers(2, k, size=n))
+    units = int(rng.integers(min_level.sum(), max_level.sum() + 1))
+    allocator = GasLiftAllocator(rates, 0.5, 0.5 * units, 0.5 * min_level, 0.5 * max_level)
+    assert allocator.levels.sum() <= units
+    assert np.all((allocator.levels >= min_level) & (allocator.levels <= max_level))
+    assert allocator.total_rate() == pytest.approx(_brute_force(rates, units, min_level, max_level))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_update_well_matches_a_fresh_allocation(seed):
+    rng = np.random.default_rng(seed)
+    rates = _threshold_curves(rng, 4, 6)
+    allocator = GasLiftAllocator(rates, 1.0, 9.0)
+    well = int(rng.integers(0, 4))
+    rates[well] = _threshold_curves(rng, 1, 6)[0]
+    allocator.update_well(well, rates[well])
+    # el allocator guarda la curva nueva, total_rate no necesita la matriz
+    np.testing.assert_array_equal(allocator.rates, rates)
+    assert allocator.total_rate() == pytest.approx(GasLiftAllocator(rates, 1.0, 9.0).total_rate())
+    assert allocator.total_rate() == pytest.approx(_brute_force(rates, 9, [0] * 4, [5] * 4))
+
+
+def test_rejected_update_leaves_the_allocation_intact():
+    rates = np.sqrt(np.arange(6.0))[None, :] * np.array([[100], [200]])
+    allocator = GasLiftAllocator(rates, 1.0, 4.0)
+    before = (allocator.levels.copy(), allocator.min_level.copy(), allocator.max_level.copy(),
+              allocator.rates.copy())
+    with pytest.raises(ValueError):
+        allocator.update_well(0, 2 * rates[0], g_min=3, g_max=1)
+    with pytest.raises(ValueError):
+        allocator.update_well(0, 2 * rates[0], g_min=5)
+    after = (allocator.levels, allocator.min_level, allocator.max_level, allocator.rates)
+    for old, new in zip(before, after):
+        np.testing.assert_array_equal(old, new)
@@ -0,0 +1,51 @@
+#IPR de gas con la tabla de pseudopresion
+import numpy as np
+import pytest
+from scipy.integrate import quad
+import potencial_gas as pg
+from pvt import z_dak, rho_gas, mu_gas
+
+SG, T = 0.7, 200.0
+
+
+def _integrand(p):
+    z = z_dak(p, T, SG)
+    return 2 * p / (mu_gas(T, SG, rho_gas(p, T, SG, z)) * z)
+
+
+@pytest.mark.parametrize('p', [500.0, 3000.0, 12000.0, 25000.0])
+def test_pseudo_pressure_matches_quad(p):
+    assert pg.pseudo_pressure(p, SG, T) == pytest.approx(quad(_integrand, 0, p, limit=200)[0], rel=1e-6)
+
+
+@pytest.mark.parametrize('pr, b', [(3000.0, 0.0), (3000.0, 2e-3), (24000.0, 0.0)])
+def test_rate_and_pwf_round_trip(pr, b):
+    pwf = np.linspace(pr, 0, 101)
+    rate = pg.qg_vec(5000, 0.6 * pr, pr, pwf, SG, T, b)
+    assert np.all(np.diff(rate) > 0)
+    np.testing.assert_allclose(pg.pwf_qg_vec(5000, 0.6 * pr, pr, rate, SG, T, b), pwf, atol=1e-6 * pr)
+    assert rate[-1] == pytest.approx(pg.aof_gas(5000, 0.6 * pr, pr, SG, T, b))
+    assert np.isnan(pg.pwf_qg_vec(5000, 0.6 * pr, pr, 1.01 * rate[-1], SG, T, b))
+
+
+def test_deliverability_index_gives_the_same_curve_as_the_test():
+    pr, pwf = 3000.0, np.linspace(3000, 0, 11)
+    J = pg.j_gas(5, 50, T, 1000, 0.35, 0)
+    q_test = J * (pg.pseudo_pressure(pr, SG, T) - pg.pseudo_pressure(2000, SG, T))
+    np.testing.assert_allclose(pg.qg_vec(None, None, pr, pwf, SG, T, J=J),
+                               pg.qg_vec(q_test, 2000, pr, pwf, SG, T), rtol=1e-12)
+
+
+def test_table_rejects_pressures_above_its_range():
+    table = pg.gas_table(SG, T)
+    with pytest.raises(ValueError):
+        table.pseudo_pressure(table.p[-1] + 1)
+
+
+def test_operating_point_of_a_deep_high_pressure_well():
+    # Pr y Po por encima de la malla por defecto (20000 psia): las dos tablas se alargan
+    q, pwf = pg.gas_operating_point(5000, 24000, 28000, 17000, 0.65, 300, 2.441, 22000, 22000, 120, 300)
+    po = pg.po_gas(q, 17000, 0.65, 2.441, 22000, 22000, 120, 300)[0]
+    assert 0 < q < pg.aof_gas(5000, 24000, 28000, 0.65, 300)
+    assert pwf == pytest.approx(po, rel=1e-6)
+    assert po > 20000
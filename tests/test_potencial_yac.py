@@ -0,0 +1,60 @@
+#las funciones vectorizadas de potencial_yac contra las escalares, en todas las ramas de ef/ef2 y Pb
+import itertools
+import numpy as np
+import pytest
+import potencial_yac as py
+import utilities
+
+# (ef, ef2) validas: las cinco ramas de aof()
+EF_CASES = [(1, None), (0.8, None), (1.3, None), (0.8, 1.2), (1.3, 0.8)]
+# (pr, pb): subsaturado y saturado
+RESERVOIRS = [(4000, 2500), (2500, 2500), (2500, 3000)]
+PWF_TESTS = [3000, 1500]
+PWFS = [3500, 2800, 2000, 1000, 0]
+
+
+def _cases():
+    for (ef, ef2), (pr, pb), pwf_test in itertools.product(EF_CASES, RESERVOIRS, PWF_TESTS):
+        if pwf_test < pr:
+            yield 1000, pwf_test, pr, pb, ef, ef2
+
+
+@pytest.mark.parametrize('q_test, pwf_test, pr, pb, ef, ef2', list(_cases()))
+def test_vectorized_matches_scalar(q_test, pwf_test, pr, pb, ef, ef2):
+    pwf = np.array([p for p in PWFS if p <= pr], dtype=float)
+    args = (q_test, pwf_test, pr, pb)
+    assert py.j_vec(*args, ef, ef2) == pytest.approx(py.j(*args, ef, ef2), rel=1e-12)
+    assert py.aof_vec(*args, ef, ef2) == pytest.approx(py.aof(*args, ef, ef2), rel=1e-12)
+    expected = [py.Qo(q_test, pwf_test, pr, p, pb, ef, ef2) for p in pwf]
+    np.testing.assert_allclose(py.Qo_vec(q_test, pwf_test, pr, pwf, pb, ef, ef2), expected, rtol=1e-12)
+    np.testing.assert_allclose(py.IPRModel(*args, ef, ef2).rate(pwf), expected, rtol=1e-12)
+
+
+def test_utilities_uses_the_same_formulas():
+    args = (1000, 2500, 4000, 5000, 1.3, 0.8)
+    assert utilities.aof(*args) == utilities.aof_vec(*args) == py.aof(*args)
+
+
+@pytest.mark.parametrize('ef, ef2', [(1, 1.2), (0.8, 0.9), (1.3, 1.1)])
+def test_invalid_ef_combination_raises(ef, ef2):
+    with pytest.raises(ValueError):
+        py.aof(1000, 1500, 4000, 2500, ef, ef2)
+    with pytest.raises(ValueError):
+        py.aof_vec(1000, 1500, 4000, 2500, ef, ef2)
+
+
+# Pwf -> Qo -> Pwf por encima y por debajo de Pb, en las curvas invertibles (sin salto en Pb)
+@pytest.mark.parametrize('pr, pb, ef, ef2', [(4000, 2500, 1, None), (2500, 3000, 1, None),
+                                             (2500, 3000, 0.8, None), (2500, 3000, 0.8, 1.2)])
+def test_pwf_inverts_qo(pr, pb, ef, ef2):
+    pwf = np.linspace(pr, 0, 201)
+    rate = py.Qo_vec(1000, 1500, pr, pwf, pb, ef, ef2)
+    np.testing.assert_allclose(py.pwf_Qo_vec(1000, 1500, pr, rate, pb, ef, ef2), pwf, atol=1e-6)
+    model = py.IPRModel(1000, 1500, pr, pb, ef, ef2)
+    np.testing.assert_allclose(model.pwf(model.rate(pwf)), pwf, atol=1e-6)
+
+
+def test_pwf_is_nan_above_the_maximum_rate():
+    aof = py.aof_vec(1000, 1500, 4000, 2500)
+    assert np.isnan(py.pwf_Qo_vec(1000, 1500, 4000, 1.01 * aof, 2500))
+    assert py.pwf_Qo_vec(1000, 1500, 4000, aof, 2500) == pytest.approx(0, abs=1e-6)
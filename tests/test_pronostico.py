@@ -0,0 +1,38 @@
+#pronostico con agotamiento: el caudal cae con la produccion acumulada
+import numpy as np
+import pytest
+from potencial_yac import Qo_vec, j_vec
+from pronostico import forecast, tank_pressure, _equivalent_test
+
+WELLS = dict(q_test=[1200, 800], pwf_test=[2200, 1800], pr=[3500, 2600], pb=[2300, 2000], THP=100, API=35,
+             wc=0.2, sg_h2o=1.07, ID=2.992, tvd=3000, md=3000, N=[3e6, 1.5e6])
+
+
+@pytest.mark.parametrize('fluid', [{}, {'gor': 500, 'sg_gas': 0.7, 't_res': 190}])
+def test_rate_falls_with_cumulative_production(fluid):
+    result = forecast(**WELLS, days=1800, report_every=30, **fluid)
+    assert np.all(np.diff(result.Np, axis=1) >= 0)
+    for q, pr, Np in zip(result.q, result.pr, result.Np):
+        flowing = q > 0
+        # orden por acumulada: caudal y presion nunca suben
+        order = np.argsort(Np[flowing], kind='stable')
+        assert np.all(np.diff(q[flowing][order]) <= 1e-9)
+        assert np.all(np.diff(pr[flowing][order]) <= 1e-9)
+    # el primer pozo pasa por debajo de Pb durante el pronostico
+    assert result.pr[0, 0] > WELLS['pb'][0] > result.pr[0, -1]
+
+
+def test_equivalent_test_rebuilds_the_initial_ipr():
+    # a la presion inicial la IPR reconstruida es la de la prueba
+    q_test, pwf_test, pr, pb = 1200.0, 2200.0, 3500.0, 2300.0
+    J = j_vec(q_test, pwf_test, pr, pb)
+    q_eq, pwf_eq = _equivalent_test(J, pr, pb)
+    pwf = np.linspace(pr, 0, 21)
+    np.testing.assert_allclose(Qo_vec(q_eq, pwf_eq, pr, pwf, pb), Qo_vec(q_test, pwf_test, pr, pwf, pb), rtol=1e-12)
+
+
+def test_tank_pressure_is_continuous_at_the_bubble_point():
+    pi, pb, N, ct, ct_sat = 3500.0, 2300.0, 2e6, 1.5e-5, 1e-4
+    np_b = N * ct * (pi - pb)
+    assert tank_pressure(np_b, pi, pb, N, ct, ct_sat) == pytest.approx(pb)
+    assert tank_pressure(np_b + N * ct_sat * 100, pi, pb, N, ct, ct_sat) == pytest.approx(pb - 100)
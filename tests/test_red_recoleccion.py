@@ -0,0 +1,62 @@
+#red de recoleccion: el Newton acoplado contra una iteracion de punto fijo pozo por pozo
+import numpy as np
+import pytest
+from analisis_nodal import operating_point
+from red_recoleccion import GatheringNetwork, line_dp
+
+WELLS = {
+    'q_test': [1200, 900, 1500, 700], 'pwf_test': [1800, 2000, 1600, 2100], 'pr': [4000, 3800, 4200, 3600],
+    'pb': [2500, 2400, 2600, 2300], 'API': 35, 'wc': [0.2, 0.4, 0.1, 0.5], 'sg_h2o': 1.07, 'ID': 2.992,
+    'tvd': [6000, 6500, 6200, 5800], 'md': [6000, 6500, 6200, 5800], 'manifold': [0, 0, 1, 1],
+    'fl_length': 0.0, 'fl_ID': 4.0,
+}
+# manifold 1 descarga en el 0 y el 0 en el separador
+MANIFOLDS = {'parent': [-1, 0], 'length': [15000, 8000], 'ID': [3.0, 2.5]}
+P_SEP = 150.0
+
+
+def _network():
+    return GatheringNetwork(WELLS, MANIFOLDS, P_SEP)
+
+
+# sin lineas de flujo el THP de cada pozo es la presion de su manifold: cada pozo se resuelve con
+# operating_point y las presiones de los manifolds con los caudales, hasta que no cambian
+def _fixed_point(network, iterations=200):
+    w, m = network.wells, network.manifolds
+    p = np.full(len(m['parent']), P_SEP)
+    for _ in range(iterations):
+        q, _ = operating_point(w['q_test'], w['pwf_test'], w['pr'], w['pb'], p[w['manifold'].astype(int)], w['API'],
+                               w['wc'], w['sg_h2o'], w['ID'], w['tvd'], w['md'], w['C'])
+        Q = network._manifold_flow(q)
+        dp = line_dp(Q, network._line_gradient, m['length'], m['ID'], m['C'], m['dz'])
+        p_new = np.empty_like(p)
+        p_new[0] = P_SEP + dp[0]
+        p_new[1] = p_new[0] + dp[1]
+        if np.abs(p_new - p).max() < 1e-9:
+            return q, p_new
+        p = 0.5 * (p + p_new)
+    raise AssertionError("fixed point did not converge")
+
+
+def test_newton_matches_per_well_fixed_point():
+    network = _network()
+    solution = network.solve(tol=1e-10)
+    q, p = _fixed_point(network)
+    np.testing.assert_allclose(solution.q, q, rtol=1e-6)
+    np.testing.assert_allclose(solution.p_manifold, p, rtol=1e-6)
+    np.testing.assert_allclose(solution.thp, p[[0, 0, 1, 1]], rtol=1e-9)
+    assert solution.residual < 1e-6
+
+
+def test_warm_start_converges_faster():
+    network = _network()
+    cold = network.solve(tol=1e-10)
+    # cambio chico en una prueba: el nuevo solve arranca desde la solucion anterior
+    network.wells['q_test'][0] *= 1.05
+    warm = network.solve(tol=1e-10)
+    fresh = _network()
+    fresh.wells['q_test'][0] *= 1.05
+    reference = fresh.solve(tol=1e-10)
+    assert warm.iterations < cold.iterations
+    np.testing.assert_allclose(warm.q, reference.q, rtol=1e-8)
+    assert warm.q[0] > cold.q[0]
@@ -0,0 +1,154 @@
+#VLP multifasica: recorrido de presion desde la cabeza hasta el fondo con la correlacion de Beggs & Brill,
+#por segmentos a lo largo de md con inclinacion constante (sen = tvd / md). Todos los caudales avanzan
+#juntos como arreglos y cada uno ajusta su propio largo de segmento (Heun con estimacion de error contra
+#Euler) para acotar el error con la menor cantidad de pasos. Las propiedades PVT (Rs, Bo, viscosidades, z)
+#se leen de las tablas de pvt.py, construidas una vez por fluido
+import numpy as np
+from analisis_nodal import sg_oil
+from pvt import fluid_lookup, rho_gas
+
+G = 32.174  # ft/s2, igual a gc en lbm ft/(lbf s2)
+
+
+# dp/dL (psi/ft) de Beggs & Brill separado en gravedad y friccion (ambos ya divididos por 1 - Ek)
+# lookup es la funcion de pvt.fluid_lookup para estos fluidos, si no se da se resuelve en cada llamada
+def beggs_brill_gradient(p, T, Q, API, wc, sg_h2o, ID, sin_theta, gor, sg_gas, roughness, mu_h2o=0.6,
+                         correlation='standing', lookup=None):
+    D = ID / 12
+    area = 0.25 * np.pi * D ** 2
+    sg_o = sg_oil(API)
+
+    # PVT @ p, T
+    if lookup is None:
+        lookup = fluid_lookup(API, sg_gas, correlation)
+    rs, bo, mu_o, z, mu_g = lookup(p, T, gor)
+    rho_o = (62.428 * sg_o + 0.0136 * rs * sg_gas) / bo
+    rho_w = 62.428 * sg_h2o
+    rho_g = rho_gas(p, T, sg_gas, z)
+    bg = 0.02827 * z * (T + 460) / p  # ft3/scf
+
+    # Velocidades superficiales (ft/s)
+    q_oil = Q * (1 - wc) * bo * 5.615 / 86400
+    q_water = Q * wc * 5.615 / 86400
+    q_gas = Q * (1 - wc) * np.maximum(gor - rs, 0) * bg / 86400
+    v_sl = (q_oil + q_water) / area
+    v_sg = q_gas / area
+    v_m = v_sl + v_sg
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f_oil = np.where(q_oil + q_water > 0, q_oil / (q_oil + q_water), 1 - wc)
+        rho_l = rho_o * f_oil + rho_w * (1 - f_oil)
+        mu_l = mu_o * f_oil + mu_h2o * (1 - f_oil)
+        sigma_l = 30.0 * f_oil + 70.0 * (1 - f_oil)  # dyne/cm
+        flowing = v_m > 0
+        lam = np.where(flowing, v_sl / v_m, 1.0)
+        n_fr = v_m ** 2 / (G * D)
+        n_lv = 1.938 * v_sl * (rho_l / sigma_l) ** 0.25
+
+        # Patron de flujo
+        L1 = 316 * lam ** 0.302
+        L2 = 0.0009252 * lam ** -2.4684
+        L3 = 0.1 * lam ** -1.4516
+        L4 = 0.5 * lam ** -6.738
+        segregated = ((lam < 0.01) & (n_fr < L1)) | ((lam >= 0.01) & (n_fr < L2))
+        transition = (lam >= 0.01) & (n_fr >= L2) & (n_fr <= L3)
+        distributed = ((lam < 0.4) & (n_fr >= L1)) | ((lam >= 0.4) & (n_fr > L4))
+
+        # Holdup horizontal y correccion por inclinacion (flujo ascendente) por patron
+        def holdup(a, b, c, d, e, f, g):
+            hl0 = np.maximum(a * lam ** b / n_fr ** c, lam)
+            if d is None:
+                return hl0
+            C = np.maximum((1 - lam) * np.log(d * lam ** e * n_lv ** f * n_fr ** g), 0)
+            C = np.where(np.isfinite(C), C, 0)
+            s = np.sin(1.8 * np.arcsin(sin_theta))
+            return hl0 * (1 + C * (s - s ** 3 / 3))
+
+        hl_seg = holdup(0.98, 0.4846, 0.0868, 0.011, -3.768, 3.539, -1.614)
+        hl_int = holdup(0.845, 0.5351, 0.0173, 2.96, 0.305, -0.4473, 0.0978)
+        hl_dis = holdup(1.065, 0.5824, 0.0609, None, None, None, None)
+        A = (L3 - n_fr) / (L3 - L2)
+        hl = np.select([segregated, transition, distributed],
+                       [hl_seg, A * hl_seg + (1 - A) * hl_int, hl_dis], hl_int)
+        hl = np.where(flowing, np.clip(hl, 0, 1), 1.0)
+
+        # Friccion: factor sin deslizamiento (Swamee-Jain / laminar) corregido por exp(s)
+        rho_n = rho_l * lam + rho_g * (1 - lam)
+        mu_n = mu_l * lam + mu_g * (1 - lam)
+        n_re = 1488 * rho_n * v_m * D / mu_n
+        f_n = np.where(n_re < 2000, 64 / n_re,
+                       0.25 / np.log10(roughness / (3.7 * D) + 5.74 / n_re ** 0.9) ** 2)
+        y = lam / hl ** 2
+        ln_y = np.log(y)
+        s = np.where((y > 1) & (y < 1.2), np.log(2.2 * y - 1.2),
+                     ln_y / (-0.0523 + 3.182 * ln_y - 0.8725 * ln_y ** 2 + 0.01853 * ln_y ** 4))
+        f_tp = f_n * np.exp(np.where(np.isfinite(s), s, 0))
+
+        rho_s = rho_l * hl + rho_g * (1 - hl)
+        gravity = rho_s * sin_theta / 144
+        friction = np.where(flowing, f_tp * rho_n * v_m ** 2 / (2 * G * D) / 144, 0)
+        ek = np.minimum(rho_s * v_m * v_sg / (G * p * 144), 0.95)
+
+    return gravity / (1 - ek), friction / (1 - ek)
+
+
+# Recorrido de presion THP -> fondo para todos los caudales a la vez.
+# Devuelve Po(psia), Pgravity(psia) y Pf(psia) con la forma del broadcasting de los argumentos.
+# tol es el error local admitido por segmento (psi), los segmentos quedan entre min_step y max_step (ft).
+# lookup es una pvt.fluid_lookup ya resuelta para API y sg_gas (la reusan quienes llaman muchas veces con los
+# mismos pozos), si no se da se resuelve en cada recorrido
+def traverse_beggs_brill(Q, THP, API, wc, sg_h2o, ID, tvd, md, gor=400, sg_gas=0.65, t_wh=100, t_bh=180,
+                         roughness=0.0006, tol=0.5, min_step=10, max_step=1000, maxiter=10000,
+                         correlation='standing', lookup=None):
+    Q, THP, API, wc, sg_h2o, ID, tvd, md, gor, sg_gas, t_wh, t_bh, roughness = (
+        np.array(arg, dtype=float) for arg in np.broadcast_arrays(
+            Q, THP, API, wc, sg_h2o, ID, tvd, md, gor, sg_gas, t_wh, t_bh, roughness))
+    if np.any(THP <= 0):
+        raise ValueError("THP must be positive")
+    if np.any(md < tvd):
+        raise ValueError("md must be greater than or equal to tvd")
+    sin_theta = np.where(md > 0, tvd / np.where(md > 0, md, 1), 1.0)
+    if lookup is None:
+        lookup = fluid_lookup(API, sg_gas, correlation)
+
+    def gradient(p, L):
+        T = t_wh + (t_bh - t_wh) * np.where(md > 0, L / np.where(md > 0, md, 1), 0)
+        return beggs_brill_gradient(p, T, Q, API, wc, sg_h2o, ID, sin_theta, gor, sg_gas, roughness,
+                                    lookup=lookup)
+
+    p = THP.copy()
+    p_gravity = np.zeros_like(p)
+    p_friction = np.zeros_like(p)
+    L = np.zeros_like(p)
+    step = np.clip(md / 20, min_step, max_step)
+    active = L < md
+
+    for _ in range(maxiter):
+        if not active.any():
+            break
+        dl = np.minimum(step, md - L)
+        g1, f1 = gradient(p, L)
+        p_euler = p + dl * (g1 + f1)
+        g2, f2 = gradient(p_euler, L + dl)
+        dg = 0.5 * dl * (g1 + g2)
+        df = 0.5 * dl * (f1 + f2)
+        error = np.abs(dg + df - dl * (g1 + f1))
+
+        # se acepta el segmento si el error es tolerable o ya se llego al paso minimo
+        accept = active & ((error <= tol) | (dl <= min_step))
+        p = np.where(accept, p + dg + df, p)
+        p_gravity = np.where(accept, p_gravity + dg, p_gravity)
+        p_friction = np.where(accept, p_friction + df, p_friction)
+        L = np.where(accept, L + dl, L)
+        with np.errstate(divide='ignore'):
+            factor = np.clip(0.9 * np.sqrt(tol / error), 0.2, 4.0)
+        step = np.where(active, np.clip(dl * factor, min_step, max_step), step)
+        active = L < md
+    else:
+        raise ValueError("Pressure traverse did not reach md within maxiter segments")
+
+    return p, p_gravity, p_friction
+
+# Po(psia) @ Q con Beggs & Brill, mismos argumentos que analisis_nodal.po_vlp mas los del fluido
+def po_beggs_brill(Q, THP, API, wc, sg_h2o, ID, tvd, md, **fluid):
+    return traverse_beggs_brill(Q, THP, API, wc, sg_h2o, ID, tvd, md, **fluid)[0]
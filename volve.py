@@ -0,0 +1,164 @@
+#lectura de los archivos de produccion diaria del campo VOLVE: el Excel se parsea una sola vez, se guarda
+#una copia columnar (Parquet) nombrada con el hash del contenido y las cargas siguientes leen esa copia
+import hashlib
+import io
+import os
+import numpy as np
+import pandas as pd
+from decimacion import lttb, minmax
+from declinacion import fit_arps, arps_model
+
+CACHE_DIR = os.environ.get('VOLVE_CACHE_DIR',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_volve'))
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _read_bytes(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'getvalue'):  # st.file_uploader, BytesIO
+        return source.getvalue()
+    if hasattr(source, 'read'):
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+# columnas de texto como dtype 'string' para que el Parquet tenga un tipo por columna
+def _normalize(df):
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].astype('string')
+    return df
+
+
+# Produccion VOLVE desde bytes, ruta o archivo subido; Parquet en cache_dir si ya se leyo antes
+def load_production(source, cache_dir=CACHE_DIR):
+    data = _read_bytes(source)
+    path = os.path.join(cache_dir, content_hash(data) + '.parquet')
+    if os.path.exists(path):
+        return pd.read_parquet(path, memory_map=True)
+
+    df = _normalize(pd.read_excel(io.BytesIO(data)))
+    os.makedirs(cache_dir, exist_ok=True)
+    # se escribe en un temporal y se renombra para que otra sesion nunca lea un archivo a medias
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return df
+
+
+#indice de la produccion por pozo: fechas convertidas una sola vez (sin filas de fecha invalida), codigos
+#de pozo categoricos y filas ordenadas por (pozo, fecha), asi cada pozo es un bloque contiguo que se
+#obtiene con un slice
+WELL_COLUMN = 'WELL_BORE_CODE'
+DATE_COLUMN = 'DATEPRD'
+OIL_COLUMN = 'BORE_OIL_VOL'
+WATER_COLUMN = 'BORE_WAT_VOL'
+
+
+class ProductionIndex:
+    __slots__ = ('data', 'wells', 'summary', '_bounds', '_decimated', '_declines')
+
+    def __init__(self, data):
+        data = data.dropna(subset=[WELL_COLUMN])
+        data = data.assign(**{DATE_COLUMN: pd.to_datetime(data[DATE_COLUMN], errors='coerce'),
+                              WELL_COLUMN: data[WELL_COLUMN].astype('category')})
+        # filas sin fecha valida fuera: NaT queda al final de cada pozo y seria su ultima fecha y caudal
+        data = data.dropna(subset=[DATE_COLUMN])
+        data = data.sort_values([WELL_COLUMN, DATE_COLUMN], kind='stable').reset_index(drop=True)
+        wells = data[WELL_COLUMN].cat.categories
+        codes = data[WELL_COLUMN].cat.codes.to_numpy()
+        bounds = np.searchsorted(codes, np.arange(len(wells) + 1))
+        present = bounds[1:] > bounds[:-1]
+
+        self.data = data
+        self.wells = list(wells[present])
+        self._bounds = {well: (int(start), int(stop))
+                        for well, start, stop in zip(self.wells, bounds[:-1][present], bounds[1:][present])}
+        self.summary = self._summarize(bounds[:-1][present], bounds[1:][present])
+        self._decimated = {}
+        self._declines = {}
+
+    # acumulados, corte de agua y ultimo caudal de cada pozo sobre los bloques contiguos
+    def _summarize(self, starts, stops):
+        oil = self.data[OIL_COLUMN].fillna(0).to_numpy(dtype=float)
+        water = self.data[WATER_COLUMN].fillna(0).to_numpy(dtype=float)
+        cum_oil = np.add.reduceat(oil, starts) if len(starts) else np.array([])
+        cum_water = np.add.reduceat(water, starts) if len(starts) else np.array([])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            water_cut = cum_water / (cum_oil + cum_water)
+        dates = self.data[DATE_COLUMN]
+        summary = pd.DataFrame({
+            'first_date': dates.to_numpy()[starts],
+            'last_date': dates.to_numpy()[stops - 1],
+            'cum_oil': cum_oil,
+            'cum_water': cum_water,
+            'water_cut': water_cut,
+            'last_oil_rate': oil[stops - 1],
+            'last_water_rate': water[stops - 1],
+        }, index=pd.Index(self.wells, name=WELL_COLUMN))
+        return summary
+
+    def __len__(self):
+        return len(self.wells)
+
+    def __contains__(self, well):
+        return well in self._bounds
+
+    # filas de un pozo, ya ordenadas por fecha
+    def well(self, well):
+        start, stop = self._bounds[well]
+        return self.data.iloc[start:stop]
+
+    # una columna de un pozo como arreglo de numpy (vista, sin copia)
+    def series(self, well, column):
+        start, stop = self._bounds[well]
+        return self.data[column].to_numpy()[start:stop]
+
+    # fechas y valores de una columna reducidos a n_out puntos para graficar, se guardan por pozo
+    def decimated(self, well, column, n_out=1000, method='lttb'):
+        key = (well, column, n_out, method)
+        if key not in self._decimated:
+            dates = self.series(well, DATE_COLUMN)
+            values = self.series(well, column)
+            if method == 'lttb':
+                index = lttb(dates, values, n_out)
+            elif method == 'minmax':
+                index = minmax(values, n_out)
+            else:
+                raise ValueError(f"Unknown decimation method: {method}")
+            self._decimated[key] = (dates[index], values[index])
+        return self._decimated[key]
+
+    # Arps de todos los pozos desde su caudal maximo (dias con produccion > 0), un ajuste por columna que
+    # queda guardado en el indice. Di en 1/dia, t0 es la fecha del pico
+    def decline(self, column=OIL_COLUMN):
+        if column not in self._declines:
+            starts = np.array([self._bounds[well][0] for well in self.wells], dtype=int)
+            stops = np.array([self._bounds[well][1] for well in self.wells], dtype=int)
+            well = np.repeat(np.arange(len(self.wells)), stops - starts)
+            q = self.data[column].to_numpy(dtype=float, na_value=np.nan)
+            dates = self.data[DATE_COLUMN].to_numpy()
+            rows = np.arange(len(q))
+
+            # primera fila con el caudal maximo de cada pozo
+            if len(starts):
+                peak = np.fmax.reduceat(np.where(np.isnan(q), -np.inf, q), starts)
+                first_peak = np.minimum.reduceat(np.where(q == peak[well], rows, len(q)), starts)
+            else:
+                first_peak = np.array([], dtype=int)
+            t0 = dates[np.minimum(first_peak, max(len(q) - 1, 0))] if len(q) else dates[:0]
+            use = (rows >= first_peak[well]) & (q > 0) & ~np.isnat(dates)
+            # un pozo sin puntos validos (caudales NaN o cero) no tiene pico: t0 = NaT, no la fecha de otro pozo
+            t0 = np.where(np.bincount(well[use], minlength=len(self.wells)) > 0, t0, np.datetime64('NaT'))
+            t = (dates[use] - t0[well[use]]) / np.timedelta64(1, 'D')
+            fit = fit_arps(t, q[use], well[use], len(self.wells))
+
+            self._declines[column] = pd.DataFrame({
+                't0': t0, 'qi': fit['qi'], 'Di': fit['Di'], 'b': fit['b'], 'model': arps_model(fit['b']),
+                'r2': fit['r2'], 'points': fit['points'],
+            }, index=pd.Index(self.wells, name=WELL_COLUMN))
+        return self._declines[column]